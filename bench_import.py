@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# Import-time budget for the package's modules.
+#
+# Each module is imported in a fresh interpreter with `-X importtime`; the
+# median cumulative time over several runs is compared with its budget,
+# and the heavy dependencies that must stay deferred are checked too.
+#
+#   python bench_import.py            # report, exit 1 on any regression
+#   python bench_import.py --runs 9
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Budget per module in microseconds of cumulative import time. Eager
+# imports of requests or NumPy alone cost 100,000+ us.
+IMPORT_BUDGET_US = {
+    "ebay_inventory": 20000,
+    "ebay_transport": 20000,
+    "ebay_cache": 20000,
+    "ebay_locations": 20000,
+    "ebay_accounts": 30000,
+    "ebay_reconcile": 30000,
+    "ebay_snapshot": 40000,
+    "ebayctl": 40000,
+    "ebay_daemon": 60000,
+}
+
+# Dependencies none of the budgeted modules may import eagerly
+HEAVY_MODULES = ("requests", "urllib3", "numpy", "httpx", "h2",
+                 "multiprocessing", "http.server", "email")
+
+_IMPORTTIME = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| (.*)$")
+
+
+# Import `module` in a fresh interpreter; returns (cumulative_us, loaded)
+# where loaded lists the HEAVY_MODULES that ended up in sys.modules
+def measure(module):
+    code = (f"import sys, {module}; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=HERE, capture_output=True, text=True, check=True)
+    cumulative = None
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if match and match.group(2).strip() == module:
+            cumulative = int(match.group(1))
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return cumulative, loaded
+
+
+# Median timing and heavy imports per module; returns a list of
+# (module, median_us, budget_us, loaded) rows
+def check(modules=None, runs=5):
+    rows = []
+    for module in modules or IMPORT_BUDGET_US:
+        samples = []
+        loaded = []
+        for _ in range(runs):
+            cumulative, loaded = measure(module)
+            samples.append(cumulative)
+        rows.append((module, statistics.median(samples),
+                     IMPORT_BUDGET_US[module], loaded))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time budget check")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("modules", nargs="*")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module, median, budget, loaded in check(args.modules, args.runs):
+        ok = median <= budget and not loaded
+        failed = failed or not ok
+        extra = f"  loads {', '.join(loaded)}" if loaded else ""
+        print(f"{'ok  ' if ok else 'FAIL'} {module:<16} {median / 1000:7.1f} ms"
+              f"  (budget {budget / 1000:.0f} ms){extra}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+# Benchmark RequestsTransport (HTTP/1.1) against Http2Transport on local
+# stand-ins for the Inventory API.
+#
+# Both stand-ins answer get_stock after a fixed simulated latency and gzip
+# the JSON body when the client accepts it. With the same small connection
+# budget, HTTP/1.1 can only have one request in flight per connection
+# while HTTP/2 multiplexes every concurrent call as a separate stream.
+#
+#   python bench_transport.py --requests 200 --concurrency 32 --connections 2
+#
+# Needs `pip install "httpx[http2]"` (which brings in h2).
+import argparse
+import asyncio
+import gzip
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ebay_accounts import AccountClient
+from ebay_transport import Http2Transport, RequestsTransport
+
+API_PATH = "/sell/inventory/v1"
+
+
+def _stock_body(sku, accept_encoding):
+    body = json.dumps({
+        "sku": sku,
+        "product": {"title": f"Stand-in item {sku}", "description": "x" * 2000},
+        "availability": {"ship_to_location_availability": {"quantity": 7}},
+    }).encode()
+    if "gzip" in accept_encoding:
+        return gzip.compress(body), "gzip"
+    return body, None
+
+
+# HTTP/1.1 stand-in
+class Http1StandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.bytes_sent = 0
+        super().__init__(("127.0.0.1", 0), _Http1Handler)
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}{API_PATH}"
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _Http1Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        time.sleep(self.server.delay)
+        body, encoding = _stock_body(self.path.rsplit("/", 1)[1],
+                                     self.headers.get("Accept-Encoding", ""))
+        self.server.bytes_sent += len(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+# Cleartext HTTP/2 (h2c, prior knowledge) stand-in built on the h2 library
+class Http2StandIn:
+    def __init__(self, delay=0.02):
+        import h2.config  # noqa: F401 - fail early if h2 is missing
+
+        self.delay = delay
+        self.bytes_sent = 0
+        self.connections = 0
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._serve, "127.0.0.1", 0))
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}{API_PATH}"
+
+    async def _serve(self, reader, writer):
+        import h2.config
+        import h2.connection
+        import h2.events
+
+        self.connections += 1
+        conn = h2.connection.H2Connection(config=h2.config.H2Configuration(
+            client_side=False, header_encoding="utf-8"))
+        conn.initiate_connection()
+        writer.write(conn.data_to_send())
+        pending = {}
+        tasks = set()
+
+        async def respond(stream_id, headers):
+            await asyncio.sleep(self.delay)
+            body, encoding = _stock_body(headers[":path"].rsplit("/", 1)[1],
+                                         headers.get("accept-encoding", ""))
+            self.bytes_sent += len(body)
+            response_headers = [(":status", "200"),
+                                ("content-type", "application/json"),
+                                ("content-length", str(len(body)))]
+            if encoding:
+                response_headers.append(("content-encoding", encoding))
+            conn.send_headers(stream_id, response_headers)
+            conn.send_data(stream_id, body, end_stream=True)
+            writer.write(conn.data_to_send())
+
+        try:
+            while True:
+                data = await reader.read(65535)
+                if not data:
+                    break
+                for event in conn.receive_data(data):
+                    if isinstance(event, h2.events.RequestReceived):
+                        pending[event.stream_id] = dict(event.headers)
+                    elif isinstance(event, h2.events.DataReceived):
+                        conn.acknowledge_received_data(
+                            event.flow_controlled_length, event.stream_id)
+                    elif isinstance(event, h2.events.StreamEnded):
+                        task = asyncio.ensure_future(respond(
+                            event.stream_id, pending.pop(event.stream_id)))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                writer.write(conn.data_to_send())
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def _shutdown(self):
+        self._server.close()
+        tasks = [task for task in asyncio.all_tasks()
+                 if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+# Time `total` get_stock calls issued from `concurrency` threads
+def run_workload(client, total, concurrency):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(client.get_stock,
+                                    (f"SKU{i}" for i in range(total))))
+    elapsed = time.perf_counter() - started
+    assert all(r["availability"]["ship_to_location_availability"]["quantity"] == 7
+               for r in results)
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transport benchmark")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--connections", type=int, default=2)
+    parser.add_argument("--delay", type=float, default=0.02,
+                        help="simulated server latency in seconds")
+    args = parser.parse_args(argv)
+
+    rows = []
+
+    server = Http1StandIn(delay=args.delay)
+    client = AccountClient("bench", "TOKEN", base_url=server.base_url,
+                           transport=RequestsTransport(
+                               pool_size=args.connections, pool_block=True))
+    try:
+        rows.append(("http/1.1 requests", run_workload(
+            client, args.requests, args.concurrency), server.bytes_sent))
+    finally:
+        client.close()
+        server.stop()
+
+    server = Http2StandIn(delay=args.delay)
+    client = AccountClient("bench", "TOKEN", base_url=server.base_url,
+                           transport=Http2Transport(
+                               pool_size=args.connections,
+                               prior_knowledge=True))
+    try:
+        rows.append(("http/2 httpx", run_workload(
+            client, args.requests, args.concurrency), server.bytes_sent))
+    finally:
+        client.close()
+        server.stop()
+
+    print(f"{args.requests} get_stock calls, {args.concurrency} threads, "
+          f"{args.connections} connections, {args.delay * 1000:.0f} ms latency")
+    for name, elapsed, sent in rows:
+        print(f"{name:<20} {elapsed:8.3f} s  {args.requests / elapsed:8.1f} req/s  "
+              f"{sent / 1024:8.1f} KiB body")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+from ebay_inventory import build_stock_payload
+
+
+# get_stock-style payload for one SKU, shared by the test modules
+def stock_payload(sku, quantity):
+    return {"sku": sku, **build_stock_payload(quantity)}
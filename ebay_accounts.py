@@ -0,0 +1,236 @@
+import hashlib
+import os
+import threading
+import time
+
+from ebay_inventory import INVENTORY_API, build_headers, build_stock_payload
+from ebay_transport import Transport, create_transport
+
+# Operations the sharded runner is allowed to dispatch to a client
+OPERATIONS = ("get_stock", "update_stock")
+
+
+# Spaces out calls so a client never exceeds max_per_second
+class RateLimiter:
+    def __init__(self, max_per_second=None):
+        self.interval = 1.0 / max_per_second if max_per_second else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+# Inventory API client bound to a single seller account, with its own
+# connection pool and rate limiter. `transport` is a name from
+# ebay_transport.TRANSPORTS or a ready Transport instance. A ready instance
+# may be shared by several accounts: it is never modified, and each request
+# carries this account's token itself. An optional ebay_recorder.Recorder
+# captures every request/response pair.
+class AccountClient:
+    def __init__(self, account_id, access_token, max_per_second=None,
+                 base_url=INVENTORY_API, pool_size=10, recorder=None,
+                 transport="requests"):
+        self.account_id = account_id
+        self.base_url = base_url
+        self.recorder = recorder
+        self.limiter = RateLimiter(max_per_second)
+        self.headers = build_headers(access_token)
+        if isinstance(transport, Transport):
+            self.transport = transport
+        else:
+            self.transport = create_transport(
+                transport, headers=self.headers, pool_size=pool_size)
+
+    # Underlying requests.Session when using the requests transport
+    @property
+    def session(self):
+        return getattr(self.transport, "session", None)
+
+    def _request(self, method, path, **kwargs):
+        kwargs["headers"] = {**self.headers, **kwargs.get("headers", {})}
+        self.limiter.wait()
+        if self.recorder is None:
+            return self.transport.request(method, f"{self.base_url}{path}", **kwargs)
+        started = time.perf_counter()
+        response = self.transport.request(method, f"{self.base_url}{path}", **kwargs)
+        self.recorder.record_response(response, time.perf_counter() - started)
+        return response
+
+    # Fetch stock for an item owned by this account
+    def get_stock(self, item_id):
+        response = self._request("GET", f"/inventory_item/{item_id}")
+        if response.status_code == 200:
+            return response.json()
+        else:
+            raise Exception(f"Error fetching stock: {response.text}")
+
+    # Update stock for an item owned by this account
+    def update_stock(self, item_id, quantity):
+        response = self._request("PUT", f"/inventory_item/{item_id}",
+                                 json=build_stock_payload(quantity))
+        if response.status_code == 200 or response.status_code == 204:
+            return None
+        else:
+            raise Exception(f"Error updating stock: {response.text}")
+
+    # One page of the account's inventory items (getInventoryItems)
+    def get_inventory_items(self, limit=100, offset=0):
+        response = self._request("GET", "/inventory_item",
+                                 params={"limit": limit, "offset": offset})
+        if response.status_code == 200:
+            return response.json()
+        else:
+            raise Exception(f"Error fetching inventory items: {response.text}")
+
+    # One page of the account's merchant (warehouse) locations
+    def get_locations(self, limit=100, offset=0):
+        response = self._request("GET", "/location",
+                                 params={"limit": limit, "offset": offset})
+        if response.status_code == 200:
+            return response.json()
+        else:
+            raise Exception(f"Error fetching locations: {response.text}")
+
+    # Send one bulkUpdatePriceQuantity batch; returns the per-SKU responses
+    def bulk_update_price_quantity(self, requests):
+        response = self._request("POST", "/bulk_update_price_quantity",
+                                 json={"requests": requests})
+        if response.status_code == 200 or response.status_code == 207:
+            return response.json().get("responses", [])
+        else:
+            raise Exception(f"Error updating stock: {response.text}")
+
+    def close(self):
+        self.transport.close()
+
+
+# Known seller accounts and the settings needed to build a client for each.
+# Clients are created lazily and never shared across processes.
+class AccountRegistry:
+    def __init__(self):
+        self._accounts = {}
+        self._clients = {}
+        self._pid = os.getpid()
+
+    def register(self, account_id, access_token, max_per_second=None,
+                 base_url=INVENTORY_API, transport="requests"):
+        self._accounts[account_id] = {
+            "account_id": account_id,
+            "access_token": access_token,
+            "max_per_second": max_per_second,
+            "base_url": base_url,
+            "transport": transport,
+        }
+        self._clients.pop(account_id, None)
+
+    def accounts(self):
+        return list(self._accounts)
+
+    def config(self, account_id):
+        if account_id not in self._accounts:
+            raise Exception(f"Unknown account: {account_id}")
+        return dict(self._accounts[account_id])
+
+    def client(self, account_id):
+        # A forked child must not reuse the parent's pooled sockets
+        if os.getpid() != self._pid:
+            self._clients = {}
+            self._pid = os.getpid()
+        if account_id not in self._clients:
+            self._clients[account_id] = AccountClient(**self.config(account_id))
+        return self._clients[account_id]
+
+    def close(self):
+        for client in self._clients.values():
+            client.close()
+        self._clients = {}
+
+
+# Worker entry point: build a fresh client and run one shard of operations
+def _run_shard(config, operations):
+    client = AccountClient(**config)
+    results = []
+    errors = []
+    try:
+        for index, name, args in operations:
+            try:
+                results.append((index, getattr(client, name)(*args)))
+            except Exception as exc:
+                errors.append((index, str(exc)))
+    finally:
+        client.close()
+    return results, errors
+
+
+# Stable shard number for a SKU, identical in every process and run
+def _sku_shard(sku, parts):
+    digest = hashlib.blake2b(str(sku).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % parts
+
+
+# Run (account_id, operation, *args) tuples across a process pool.
+#
+# Operations are grouped by account. When there are more workers than
+# accounts, an account's operations are split over several shards by SKU,
+# so every operation on one SKU runs in a single shard in input order, and
+# the account's rate limit is divided between the shards so its quota
+# still holds.
+# Returns (results, errors): results is ordered like `operations` with None
+# for failures, errors maps operation index to the error message.
+def run_sharded(registry, operations, max_workers=None, executor=None):
+    operations = list(operations)
+    results = [None] * len(operations)
+    errors = {}
+
+    by_account = {}
+    for index, (account_id, name, *args) in enumerate(operations):
+        if name not in OPERATIONS:
+            errors[index] = f"Unsupported operation: {name}"
+        elif account_id not in registry.accounts():
+            errors[index] = f"Unknown account: {account_id}"
+        else:
+            by_account.setdefault(account_id, []).append((index, name, args))
+
+    if not by_account:
+        return results, errors
+
+    workers = max_workers or os.cpu_count() or 1
+    shards = []
+    for account_id, account_ops in by_account.items():
+        parts = max(1, min(workers // len(by_account), len(account_ops)))
+        by_part = {}
+        for op in account_ops:
+            by_part.setdefault(_sku_shard(op[2][0], parts), []).append(op)
+        config = registry.config(account_id)
+        if config["max_per_second"]:
+            config["max_per_second"] = config["max_per_second"] / len(by_part)
+        for part in sorted(by_part):
+            shards.append((config, by_part[part]))
+
+    owns_executor = executor is None
+    if owns_executor:
+        # multiprocessing is only paid for when a pool is actually needed
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(shards)))
+    try:
+        futures = [executor.submit(_run_shard, config, shard_ops)
+                   for config, shard_ops in shards]
+        for future in futures:
+            shard_results, shard_errors = future.result()
+            for index, value in shard_results:
+                results[index] = value
+            for index, message in shard_errors:
+                errors[index] = message
+    finally:
+        if owns_executor:
+            executor.shutdown()
+
+    return results, errors
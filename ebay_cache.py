@@ -0,0 +1,64 @@
+import threading
+import time
+
+
+# In-memory TTL cache of get_stock payloads keyed by SKU. Each entry also
+# remembers the wall-clock time (epoch seconds) its data is current as of,
+# so a late report of an older change cannot overwrite it.
+class StockCache:
+    def __init__(self, ttl=60.0):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # Cached payload for a SKU, or None when missing or expired
+    def get(self, sku):
+        with self._lock:
+            entry = self._entries.get(sku)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            self._entries.pop(sku, None)
+            self.misses += 1
+            return None
+
+    # Cache data current as of `as_of` (default: now)
+    def put(self, sku, data, as_of=None):
+        with self._lock:
+            self._entries[sku] = (time.monotonic() + self.ttl, data,
+                                  time.time() if as_of is None else as_of)
+
+    # Overwrite the cached quantity in place. Returns False, leaving the
+    # entry alone, if the SKU is not cached or its data is newer than
+    # `as_of`; callers then invalidate.
+    def set_quantity(self, sku, quantity, as_of=None):
+        if as_of is None:
+            as_of = time.time()
+        with self._lock:
+            entry = self._entries.get(sku)
+            if entry is None or entry[0] <= time.monotonic() or entry[2] > as_of:
+                return False
+            data = dict(entry[1])
+            availability = dict(data.get("availability", {}))
+            location = dict(availability.get("ship_to_location_availability", {}))
+            location["quantity"] = quantity
+            availability["ship_to_location_availability"] = location
+            data["availability"] = availability
+            self._entries[sku] = (time.monotonic() + self.ttl, data, as_of)
+            return True
+
+    def invalidate(self, sku):
+        with self._lock:
+            return self._entries.pop(sku, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {"entries": len(self), "hits": self.hits, "misses": self.misses}
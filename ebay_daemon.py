@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# Long-running inventory daemon serving a line-delimited JSON API on a Unix
+# domain socket.
+#
+# Keeps one warm AccountClient (pooled TLS connections, token) and a
+# StockCache for the lifetime of the process, so callers such as ebayctl.py
+# only pay for a local socket round trip plus the eBay call itself.
+#
+# Request:  {"op": "get_stock", "args": ["SKU1"]}
+# Response: {"ok": true, "result": {...}} or {"ok": false, "error": "..."}
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import ebay_inventory
+from ebay_accounts import AccountClient
+from ebay_cache import StockCache
+from ebay_transport import TRANSPORTS
+from ebayctl import DEFAULT_SOCKET
+
+
+# Dispatches socket requests to a warm client and cache
+class InventoryService:
+    def __init__(self, client, cache=None, bulk_workers=8):
+        self.client = client
+        self.cache = cache if cache is not None else StockCache()
+        self.bulk_workers = bulk_workers
+        self.operations = {
+            "ping": self.ping,
+            "get_stock": self.get_stock,
+            "update_stock": self.update_stock,
+            "bulk_get_stock": self.bulk_get_stock,
+            "bulk_update_stock": self.bulk_update_stock,
+            "invalidate": self.invalidate,
+            "stats": self.stats,
+        }
+
+    def ping(self):
+        return "pong"
+
+    def get_stock(self, sku, fresh=False):
+        if not fresh:
+            cached = self.cache.get(sku)
+            if cached is not None:
+                return cached
+        data = self.client.get_stock(sku)
+        self.cache.put(sku, data)
+        return data
+
+    def update_stock(self, sku, quantity):
+        self.client.update_stock(sku, quantity)
+        if not self.cache.set_quantity(sku, quantity):
+            self.cache.invalidate(sku)
+        return None
+
+    # Run fn over items on the warm pool; failures are reported per SKU
+    def _bulk(self, fn, items):
+        def run(item):
+            try:
+                return {"ok": True, "result": fn(*item)}
+            except Exception as exc:
+                return {"ok": False, "error": str(exc)}
+
+        with ThreadPoolExecutor(max_workers=self.bulk_workers) as executor:
+            outcomes = list(executor.map(run, items))
+        return {item[0]: outcome for item, outcome in zip(items, outcomes)}
+
+    def bulk_get_stock(self, skus):
+        return self._bulk(self.get_stock, [(sku,) for sku in skus])
+
+    def bulk_update_stock(self, quantities):
+        return self._bulk(self.update_stock, list(quantities.items()))
+
+    def invalidate(self, skus):
+        return [sku for sku in skus if self.cache.invalidate(sku)]
+
+    def stats(self):
+        return self.cache.stats()
+
+    # Handle one decoded request and build the reply
+    def handle(self, request):
+        try:
+            op = request["op"]
+            if op not in self.operations:
+                raise Exception(f"Unsupported operation: {op}")
+            result = self.operations[op](*request.get("args", []))
+            return {"ok": True, "result": result}
+        except Exception as exc:
+            return {"ok": False, "error": str(exc)}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError:
+                reply = {"ok": False, "error": "Invalid JSON request"}
+            else:
+                reply = self.server.service.handle(request)
+            self.wfile.write(json.dumps(reply).encode() + b"\n")
+            self.wfile.flush()
+
+
+# Threaded Unix socket server bound to an InventoryService
+class InventoryDaemon(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, service):
+        self.service = service
+        os.makedirs(os.path.dirname(os.path.abspath(socket_path)), mode=0o700,
+                    exist_ok=True)
+        _remove_stale_socket(socket_path)
+        super().__init__(socket_path, _RequestHandler)
+        os.chmod(socket_path, 0o600)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+# Remove a leftover socket file, refusing to start if a daemon is running
+# or if the path is anything other than a socket
+def _remove_stale_socket(socket_path):
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise Exception(f"Refusing to replace {socket_path}: not a socket")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except OSError:
+        os.unlink(socket_path)
+    else:
+        raise Exception(f"Daemon already listening on {socket_path}")
+    finally:
+        probe.close()
+
+
+# SIGTERM (systemd, docker stop) shuts down like Ctrl-C, so main() still
+# removes the socket, closes the client and finishes the capture file
+def _terminate(signum, frame):
+    raise KeyboardInterrupt
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="eBay inventory daemon")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    parser.add_argument("--token", default=os.environ.get(
+        "EBAY_ACCESS_TOKEN", ebay_inventory.ACCESS_TOKEN))
+    parser.add_argument("--ttl", type=float, default=60.0,
+                        help="seconds to cache get_stock results")
+    parser.add_argument("--max-per-second", type=float, default=None)
+    parser.add_argument("--transport", choices=sorted(TRANSPORTS),
+                        default="requests")
+    parser.add_argument("--notify-port", type=int, default=None,
+                        help="also accept eBay notifications on this port")
+    parser.add_argument("--notify-host", default="127.0.0.1",
+                        help="loopback address to receive notifications on")
+    parser.add_argument("--verification-token", default=os.environ.get(
+        "EBAY_VERIFICATION_TOKEN"))
+    parser.add_argument("--notify-endpoint", default="",
+                        help="public URL registered with eBay")
+    parser.add_argument("--record", default=None, metavar="PATH",
+                        help="capture API traffic for offline replay")
+    args = parser.parse_args(argv)
+    if args.notify_port is not None:
+        from ebay_notifications import is_loopback
+        if not is_loopback(args.notify_host):
+            parser.error("--notify-host must be a loopback address: "
+                         "notifications are not signature-verified")
+
+    recorder = client = server = receiver = None
+    try:
+        if args.record:
+            from ebay_recorder import Recorder
+            recorder = Recorder(args.record)
+        client = AccountClient("default", args.token,
+                               max_per_second=args.max_per_second,
+                               recorder=recorder, transport=args.transport)
+        service = InventoryService(client, StockCache(ttl=args.ttl))
+        server = InventoryDaemon(args.socket, service)
+        signal.signal(signal.SIGTERM, _terminate)
+        print(f"Listening on {args.socket}", flush=True)
+
+        # Notifications share the daemon's cache, keeping long TTLs accurate
+        if args.notify_port is not None:
+            from ebay_notifications import NotificationReceiver
+            receiver = NotificationReceiver(
+                (args.notify_host, args.notify_port), service.cache,
+                verification_token=args.verification_token,
+                endpoint=args.notify_endpoint)
+            threading.Thread(target=receiver.serve_forever, daemon=True).start()
+            print(f"Receiving notifications on {receiver.url}", flush=True)
+
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if receiver is not None:
+            receiver.shutdown()
+            receiver.server_close()
+        if server is not None:
+            server.server_close()
+        if client is not None:
+            client.close()
+        if recorder is not None:
+            recorder.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,46 @@
-import requests
+from ebay_lazy import lazy_import
+
+# Loaded on first request so payload/config helpers import instantly
+requests = lazy_import("requests")
 
 # Configuration - Replace with your actual eBay API access token
 ACCESS_TOKEN = "YOUR_EBAY_ACCESS_TOKEN"
 
+# Base URL of the eBay Sell Inventory API
+INVENTORY_API = "https://api.ebay.com/sell/inventory/v1"
 
-# Fetch stock using Inventory API
-def get_stock(item_id):
-    url = f"https://api.ebay.com/sell/inventory/v1/inventory_item/{item_id}"
-    headers = {
-        'Authorization': f'Bearer {ACCESS_TOKEN}',
+
+# Headers sent with every Inventory API call
+def build_headers(access_token):
+    return {
+        'Authorization': f'Bearer {access_token}',
         'Content-Type': 'application/json',
     }
 
+
+# Request body for a stock update
+def build_stock_payload(quantity):
+    return {
+        "availability": {
+            "ship_to_location_availability": {
+                "quantity": quantity
+            }
+        }
+    }
+
+
+# Quantity from a get_stock payload (0 when no availability is set)
+def stock_quantity(data):
+    availability = data.get("availability", {})
+    location = availability.get("ship_to_location_availability", {})
+    return location.get("quantity", 0)
+
+
+# Fetch stock using Inventory API
+def get_stock(item_id):
+    url = f"{INVENTORY_API}/inventory_item/{item_id}"
+    headers = build_headers(ACCESS_TOKEN)
+
     response = requests.get(url, headers=headers)
     if response.status_code == 200:
         return response.json()  # Stock Data
@@ -21,18 +50,9 @@ def get_stock(item_id):
 
 # Update stock for an item
 def update_stock(item_id, quantity):
-    url = f"https://api.ebay.com/sell/inventory/v1/inventory_item/{item_id}"
-    headers = {
-        'Authorization': f'Bearer {ACCESS_TOKEN}',
-        'Content-Type': 'application/json',
-    }
-    data = {
-        "availability": {
-            "ship_to_location_availability": {
-                "quantity": quantity
-            }
-        }
-    }
+    url = f"{INVENTORY_API}/inventory_item/{item_id}"
+    headers = build_headers(ACCESS_TOKEN)
+    data = build_stock_payload(quantity)
 
     response = requests.put(url, headers=headers, json=data)
     if response.status_code == 200 or response.status_code == 204:
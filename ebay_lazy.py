@@ -0,0 +1,40 @@
+# Deferred imports for heavy dependencies.
+#
+# `requests = lazy_import("requests")` binds a stand-in that imports the
+# real module on first attribute access, so importing our modules stays
+# cheap for tools that never touch the HTTP stack or NumPy. A missing
+# optional dependency raises ImportError at first use, not at import.
+import importlib
+import sys
+
+
+class LazyModule:
+    def __init__(self, name):
+        self.__dict__["_lazy_name"] = name
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            module = importlib.import_module(self.__dict__["_lazy_name"])
+            self.__dict__["_lazy_module"] = module
+        return module
+
+    # Only called for names not set on the stand-in itself, so attributes
+    # patched onto it (e.g. by unittest.mock) take precedence
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module {self.__dict__['_lazy_name']!r} ({state})>"
+
+
+# The module itself when already imported, otherwise a LazyModule
+def lazy_import(name):
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
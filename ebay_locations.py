@@ -0,0 +1,154 @@
+# Location-aware stock updates for sellers shipping from several warehouses.
+#
+# Per-warehouse quantities are validated against a cached list of the
+# account's merchant locations, totalled locally, and sent through
+# bulkUpdatePriceQuantity in batches of BULK_LIMIT SKUs, so a catalog
+# update costs ceil(skus / 25) calls instead of one call per SKU per
+# location. That endpoint uses the API's camelCase field names.
+import threading
+import time
+import weakref
+
+# Most SKUs eBay accepts in one bulkUpdatePriceQuantity call
+BULK_LIMIT = 25
+
+# Page size used when listing merchant locations
+LOCATION_PAGE_SIZE = 100
+
+# One LocationCache per live client, shared by update_location_stock calls
+_caches = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+# Caches an account's merchant locations for `ttl` seconds
+class LocationCache:
+    def __init__(self, client, ttl=3600.0):
+        self.client = client
+        self.ttl = ttl
+        self._locations = None
+        self._expires = 0.0
+        self._lock = threading.Lock()
+
+    # All merchant locations, fetched page by page on first use or expiry
+    def locations(self):
+        with self._lock:
+            if self._locations is None or time.monotonic() >= self._expires:
+                self._locations = self._fetch()
+                self._expires = time.monotonic() + self.ttl
+            return self._locations
+
+    def _fetch(self):
+        locations = []
+        offset = 0
+        while True:
+            page = self.client.get_locations(limit=LOCATION_PAGE_SIZE, offset=offset)
+            batch = page.get("locations", [])
+            locations.extend(batch)
+            offset += len(batch)
+            if not batch or offset >= page.get("total", 0):
+                return locations
+
+    # Keys of locations that can currently hold stock
+    def enabled_keys(self):
+        return {
+            location["merchantLocationKey"]
+            for location in self.locations()
+            if location.get("merchantLocationStatus", "ENABLED") == "ENABLED"
+        }
+
+    def invalidate(self):
+        with self._lock:
+            self._locations = None
+
+
+# The shared LocationCache for `client`, created on first use and dropped
+# with the client
+def location_cache(client):
+    with _caches_lock:
+        cache = _caches.get(client)
+        if cache is None:
+            cache = _caches[client] = LocationCache(client)
+        return cache
+
+
+# Totals for {sku: {location_key: quantity}}: per-SKU and per-location sums
+def aggregate_availability(quantities):
+    by_sku = {}
+    by_location = {}
+    for sku, per_location in quantities.items():
+        by_sku[sku] = sum(per_location.values())
+        for location_key, quantity in per_location.items():
+            by_location[location_key] = by_location.get(location_key, 0) + quantity
+    return {"by_sku": by_sku, "by_location": by_location}
+
+
+# bulkUpdatePriceQuantity request entry for one SKU; the distribution
+# replaces whatever eBay held for that SKU's locations
+def build_location_request(sku, per_location):
+    return {
+        "sku": sku,
+        "shipToLocationAvailability": {
+            "quantity": sum(per_location.values()),
+            "availabilityDistributions": [
+                {"merchantLocationKey": location_key, "quantity": quantity}
+                for location_key, quantity in sorted(per_location.items())
+            ],
+        },
+    }
+
+
+def _response_error(response):
+    messages = [error.get("message", str(error.get("errorId", "")))
+                for error in response.get("errors", [])]
+    return "; ".join(messages) or f"HTTP {response.get('statusCode')}"
+
+
+# Update per-location stock for many SKUs.
+#
+# `quantities` maps sku -> {location_key: quantity}. Unknown or disabled
+# location keys (after one refresh of the cached list) and negative
+# quantities are rejected before anything is sent. Without `locations`
+# the client's shared location_cache() is used. Returns
+# (updated, errors): the SKUs eBay accepted and a {sku: message} dict for
+# the rest.
+def update_location_stock(client, quantities, locations=None):
+    locations = locations if locations is not None else location_cache(client)
+    known = locations.enabled_keys()
+    requested = {key for per_location in quantities.values() for key in per_location}
+    if not requested <= known:
+        # A warehouse may have been added since the list was cached
+        locations.invalidate()
+        known = locations.enabled_keys()
+
+    errors = {}
+    pending = []
+    for sku, per_location in quantities.items():
+        unknown = sorted(set(per_location) - known)
+        if unknown:
+            errors[sku] = f"Unknown location: {', '.join(unknown)}"
+        elif any(quantity < 0 for quantity in per_location.values()):
+            errors[sku] = "Quantities must not be negative"
+        else:
+            pending.append(build_location_request(sku, per_location))
+
+    updated = []
+    for start in range(0, len(pending), BULK_LIMIT):
+        batch = pending[start:start + BULK_LIMIT]
+        try:
+            responses = client.bulk_update_price_quantity(batch)
+        except Exception as exc:
+            for request in batch:
+                errors[request["sku"]] = str(exc)
+            continue
+        by_sku = {response.get("sku"): response for response in responses}
+        for request in batch:
+            response = by_sku.get(request["sku"])
+            if response is None:
+                errors[request["sku"]] = "No response from eBay"
+            elif not isinstance(response.get("statusCode"), int):
+                errors[request["sku"]] = "No status in eBay response"
+            elif 200 <= response["statusCode"] < 300:
+                updated.append(request["sku"])
+            else:
+                errors[request["sku"]] = _response_error(response)
+    return updated, errors
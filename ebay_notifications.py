@@ -0,0 +1,301 @@
+#!/usr/bin/env python
+# Local HTTP receiver for eBay notifications that keeps a StockCache in
+# step with quantity changes made outside our system (sales, Seller Hub
+# edits), so cache TTLs can be hours instead of seconds.
+#
+# GET  ?challenge_code=...  answers eBay's endpoint validation challenge
+# POST <notification JSON>  updates or invalidates the affected SKUs
+#
+# The payload below is a LOCAL format, not an eBay-published schema: eBay
+# has no notification topic carrying inventory quantities in this shape,
+# so it is produced by our own relay (or send_notification) on the same
+# host. It borrows eBay's envelope (metadata.topic, notificationId,
+# eventDate) so a relay can forward real deliveries with little rewriting:
+#   {"metadata": {"topic": "LOCAL_INVENTORY_QUANTITY"},
+#    "notification": {"notificationId": "...",
+#                     "eventDate": "2024-05-01T12:00:00.000Z",
+#                     "data": {"sku": "A", "quantity": 3}}}
+# "data" may instead carry {"items": [{"sku": ..., "quantity": ...}, ...]};
+# a missing quantity invalidates the cached entry.
+#
+# Redelivered notificationIds are ignored and updates older than the last
+# one applied to a SKU are dropped. An update older than the cached data
+# (fetched or written by the daemon after the event) invalidates the SKU
+# instead of overwriting it. Without an eventDate a notification cannot
+# be ordered, so it only invalidates the SKUs it names.
+#
+# Nothing here verifies eBay's X-EBAY-SIGNATURE, so the receiver refuses
+# to bind anything but a loopback address unless given a verifier.
+import hashlib
+import ipaddress
+import json
+import sys
+import threading
+import urllib.error
+import urllib.request
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Largest notification body we are willing to read
+MAX_BODY_BYTES = 1024 * 1024
+
+# Topic of the local inventory format described above
+DEFAULT_TOPIC = "LOCAL_INVENTORY_QUANTITY"
+
+# How many recent notificationIds are remembered for de-duplication
+MAX_SEEN_IDS = 10000
+
+
+class NotificationError(Exception):
+    pass
+
+
+# Hash eBay expects back when it validates a notification endpoint
+def challenge_response(challenge_code, verification_token, endpoint):
+    digest = hashlib.sha256()
+    digest.update(challenge_code.encode())
+    digest.update(verification_token.encode())
+    digest.update(endpoint.encode())
+    return digest.hexdigest()
+
+
+# Validate a decoded notification and return its (sku, quantity) updates;
+# quantity is None when the SKU should only be invalidated
+def parse_notification(payload, topics=None):
+    if not isinstance(payload, dict):
+        raise NotificationError("Notification must be a JSON object")
+    metadata = payload.get("metadata")
+    notification = payload.get("notification")
+    if not isinstance(metadata, dict) or not isinstance(metadata.get("topic"), str):
+        raise NotificationError("Missing metadata.topic")
+    if topics is not None and metadata["topic"] not in topics:
+        raise NotificationError(f"Unexpected topic: {metadata['topic']}")
+    if not isinstance(notification, dict) or not isinstance(notification.get("data"), dict):
+        raise NotificationError("Missing notification.data")
+
+    data = notification["data"]
+    items = data["items"] if "items" in data else [data]
+    if not isinstance(items, list) or not items:
+        raise NotificationError("notification.data.items must be a non-empty list")
+
+    updates = []
+    for item in items:
+        if not isinstance(item, dict):
+            raise NotificationError("Each item must be a JSON object")
+        sku = item.get("sku")
+        if not isinstance(sku, str) or not sku:
+            raise NotificationError("Each item needs a non-empty sku")
+        quantity = item.get("quantity")
+        if quantity is not None and (
+                isinstance(quantity, bool) or not isinstance(quantity, int) or quantity < 0):
+            raise NotificationError(f"Invalid quantity for {sku}: {quantity!r}")
+        updates.append((sku, quantity))
+    return updates
+
+
+# Return (notification_id, event_time) of a validated notification; either
+# may be None when the sender omitted it
+def parse_delivery(payload):
+    notification = payload["notification"]
+    notification_id = notification.get("notificationId")
+    if notification_id is not None and not isinstance(notification_id, str):
+        raise NotificationError("notificationId must be a string")
+    event_date = notification.get("eventDate")
+    if event_date is None:
+        return notification_id, None
+    try:
+        event_time = datetime.fromisoformat(event_date.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        raise NotificationError(f"Invalid eventDate: {event_date!r}")
+    if event_time.tzinfo is None:
+        event_time = event_time.replace(tzinfo=timezone.utc)
+    return notification_id, event_time
+
+
+# Apply parsed updates to a StockCache; returns (updated, invalidated).
+# With `as_of` (epoch seconds of the event), entries the cache already
+# holds newer data for are invalidated rather than overwritten.
+def apply_updates(cache, updates, as_of=None):
+    updated = 0
+    invalidated = 0
+    for sku, quantity in updates:
+        if quantity is not None and cache.set_quantity(sku, quantity, as_of=as_of):
+            updated += 1
+        elif cache.invalidate(sku):
+            invalidated += 1
+    return updated, invalidated
+
+
+# Applies deliveries at most once and never lets an older event overwrite
+# a newer one, whether that came from another notification or from the
+# daemon's own reads and writes (see StockCache). Serialized so concurrent
+# deliveries apply in a safe order.
+class DeliveryLog:
+    def __init__(self, max_ids=MAX_SEEN_IDS):
+        self.max_ids = max_ids
+        self._seen = OrderedDict()
+        self._latest = {}
+        self._lock = threading.Lock()
+
+    # Apply one delivery to `cache`; returns False for a duplicate
+    def apply(self, cache, notification_id, event_time, updates):
+        with self._lock:
+            if notification_id is not None:
+                if notification_id in self._seen:
+                    return False
+                self._seen[notification_id] = True
+                if len(self._seen) > self.max_ids:
+                    self._seen.popitem(last=False)
+            if event_time is None:
+                apply_updates(cache, [(sku, None) for sku, _ in updates])
+                return True
+            fresh = []
+            for sku, quantity in updates:
+                latest = self._latest.get(sku)
+                if latest is not None and event_time < latest:
+                    continue
+                self._latest[sku] = event_time
+                fresh.append((sku, quantity))
+            apply_updates(cache, fresh, as_of=event_time.timestamp())
+            return True
+
+
+# True when host only accepts connections from this machine
+def is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class _NotificationHandler(BaseHTTPRequestHandler):
+    def _reply(self, status, body=None):
+        data = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        if body is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        codes = query.get("challenge_code")
+        if not codes or self.server.verification_token is None:
+            self._reply(400, {"error": "Missing challenge_code"})
+            return
+        self._reply(200, {"challengeResponse": challenge_response(
+            codes[0], self.server.verification_token, self.server.endpoint)})
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self._reply(411, {"error": "Content-Length required"})
+            return
+        if length < 0:
+            self._reply(400, {"error": "Invalid Content-Length"})
+            return
+        if length > MAX_BODY_BYTES:
+            self._reply(413, {"error": "Notification too large"})
+            return
+        body = self.rfile.read(length)
+
+        verifier = self.server.verifier
+        if verifier is not None and not verifier(self.headers, body):
+            self._reply(401, {"error": "Invalid signature"})
+            return
+
+        try:
+            payload = json.loads(body)
+            updates = parse_notification(payload, self.server.topics)
+            notification_id, event_time = parse_delivery(payload)
+        except ValueError:
+            self._reply(400, {"error": "Invalid JSON"})
+            return
+        except NotificationError as exc:
+            self._reply(400, {"error": str(exc)})
+            return
+
+        self.server.deliveries.apply(self.server.cache, notification_id,
+                                     event_time, updates)
+        self._reply(204)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+# HTTP server that applies incoming notifications to `cache`.
+#
+# `verifier(headers, body) -> bool` is called before a payload is trusted.
+# It is required for any non-loopback address, since anyone who can reach
+# the port could otherwise rewrite cached quantities.
+class NotificationReceiver(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, cache, verification_token=None, endpoint="",
+                 verifier=None, topics=None, verbose=False):
+        if verifier is None and not is_loopback(address[0]):
+            raise Exception(
+                f"Refusing to receive unverified notifications on {address[0]}")
+        self.cache = cache
+        self.deliveries = DeliveryLog()
+        self.verification_token = verification_token
+        self.endpoint = endpoint
+        self.verifier = verifier
+        self.topics = topics
+        self.verbose = verbose
+        super().__init__(address, _NotificationHandler)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+
+# Local stand-in for eBay's sender, for tests and manual checks.
+# Returns the HTTP status code of the receiver's reply.
+def send_notification(url, items, topic=DEFAULT_TOPIC, notification_id=None,
+                      event_date=None, headers=None):
+    if notification_id is None:
+        notification_id = str(uuid.uuid4())
+    if event_date is None:
+        event_date = datetime.now(timezone.utc).isoformat()
+    payload = {
+        "metadata": {"topic": topic, "schemaVersion": "1.0"},
+        "notification": {
+            "notificationId": notification_id,
+            "eventDate": event_date,
+            "data": {"items": [
+                {"sku": sku, "quantity": quantity} if quantity is not None
+                else {"sku": sku}
+                for sku, quantity in items
+            ]},
+        },
+    }
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode(), method="POST",
+        headers={"Content-Type": "application/json", **(headers or {})})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
+
+
+if __name__ == "__main__":
+    # Send a stand-in notification: ebay_notifications.py URL SKU[=QTY] ...
+    if len(sys.argv) < 3:
+        sys.stderr.write("usage: ebay_notifications.py URL SKU[=QTY] [...]\n")
+        sys.exit(2)
+    items = []
+    for arg in sys.argv[2:]:
+        sku, sep, quantity = arg.partition("=")
+        items.append((sku, int(quantity) if sep else None))
+    print(send_notification(sys.argv[1], items))
@@ -0,0 +1,112 @@
+# Vectorized reconciliation of warehouse quantities against eBay.
+#
+# Both sides are interned into one SkuIndex and loaded into aligned NumPy
+# arrays, so diffs, safety stock and thresholds are computed in a handful
+# of array operations instead of a Python loop per SKU.
+from ebay_inventory import stock_quantity
+from ebay_lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# Filler in aligned arrays for SKUs a side does not know about. Only a
+# placeholder: membership comes from present(), since real quantities may
+# be negative (oversold stock).
+MISSING = -1
+
+
+# Maps SKU strings to dense integer ids and back
+class SkuIndex:
+    def __init__(self, skus=()):
+        self._ids = {}
+        self.skus = []
+        self.intern_many(skus)
+
+    def intern(self, sku):
+        sku_id = self._ids.get(sku)
+        if sku_id is None:
+            sku_id = self._ids[sku] = len(self.skus)
+            self.skus.append(sku)
+        return sku_id
+
+    def intern_many(self, skus):
+        ids = self._ids
+        names = self.skus
+        out = []
+        for sku in skus:
+            sku_id = ids.get(sku)
+            if sku_id is None:
+                sku_id = ids[sku] = len(names)
+                names.append(sku)
+            out.append(sku_id)
+        return np.array(out, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.skus)
+
+
+# Pull {sku: quantity} out of get_stock payloads
+def ebay_quantities(payloads):
+    return {data["sku"]: stock_quantity(data) for data in payloads}
+
+
+# Intern a {sku: quantity} mapping; returns (ids, quantities) arrays
+def load_side(index, quantities):
+    ids = index.intern_many(quantities.keys())
+    values = np.fromiter(quantities.values(), dtype=np.int64, count=len(ids))
+    return ids, values
+
+
+# Scatter (ids, values) into a dense array of `size`, MISSING elsewhere
+def align(ids, values, size, fill=MISSING):
+    aligned = np.full(size, fill, dtype=np.int64)
+    aligned[ids] = values
+    return aligned
+
+
+# Boolean mask of `size` that is True at `ids`
+def present(ids, size):
+    mask = np.zeros(size, dtype=bool)
+    mask[ids] = True
+    return mask
+
+
+# Compute the minimal {sku: quantity} update set for eBay.
+#
+# target = clip(warehouse - safety_stock, 0, max_quantity). A SKU is
+# updated when it is missing on eBay with stock to sell, when its listed
+# quantity drifts from target by more than `threshold`, or whenever it must
+# drop to zero. SKUs listed on eBay but absent from the warehouse are
+# zeroed when `zero_missing` is set. `safety_stock` is an int or a
+# {sku: reserve} mapping.
+def reconcile(warehouse, ebay, safety_stock=0, threshold=0, max_quantity=None,
+              zero_missing=True):
+    index = SkuIndex()
+    wh_ids, wh_values = load_side(index, warehouse)
+    eb_ids, eb_values = load_side(index, ebay)
+    size = len(index)
+    if size == 0:
+        return {}
+
+    listed = align(eb_ids, eb_values, size)
+    stocked = align(wh_ids, wh_values, size)
+    in_warehouse = present(wh_ids, size)
+    on_ebay = present(eb_ids, size)
+
+    if isinstance(safety_stock, dict):
+        reserve_ids, reserve_values = load_side(index, safety_stock)
+        in_range = reserve_ids < size
+        reserve = align(reserve_ids[in_range], reserve_values[in_range], size, fill=0)
+    else:
+        reserve = safety_stock
+
+    target = np.where(in_warehouse, stocked - reserve, 0)
+    np.clip(target, 0, max_quantity, out=target)
+
+    drift = np.abs(target - listed) > threshold
+    must_zero = (target == 0) & (listed > 0)
+    needed = np.where(on_ebay, drift | must_zero, target > 0)
+    if not zero_missing:
+        needed &= in_warehouse
+
+    skus = index.skus
+    return {skus[i]: int(target[i]) for i in np.flatnonzero(needed)}
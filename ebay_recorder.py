@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+# Record/replay of Inventory API traffic for offline profiling.
+#
+# A Recorder attached to an AccountClient appends every request/response
+# pair, with its measured latency, to a gzip-compressed JSON-lines file.
+# Credentials are redacted before anything touches disk. ReplayServer
+# serves such a capture back on localhost, sleeping for each response's
+# recorded latency, so get_stock/update_stock workloads can be profiled
+# faithfully without network access:
+#
+#   client = AccountClient("a", token, recorder=Recorder("traffic.jsonl.gz"))
+#   ...
+#   python ebay_recorder.py replay traffic.jsonl.gz --port 8099
+#   AccountClient("a", "x", base_url="http://127.0.0.1:8099/sell/inventory/v1")
+import argparse
+import gzip
+import json
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from ebay_inventory import INVENTORY_API
+
+# Header values never written to a capture
+REDACTED_HEADERS = {"authorization", "cookie", "set-cookie", "x-ebay-signature"}
+REDACTED = "<redacted>"
+
+# Response headers that describe the original transfer, not the content
+_HOP_HEADERS = {"content-encoding", "content-length", "transfer-encoding",
+                "connection", "keep-alive"}
+
+
+def _redact(headers):
+    return {name: REDACTED if name.lower() in REDACTED_HEADERS else value
+            for name, value in headers.items()}
+
+
+# Appends request/response pairs to a gzip JSON-lines capture. The stream
+# is sync-flushed every `flush_every` entries so a killed process loses at
+# most that many; load_records() reads such an unterminated capture.
+class Recorder:
+    def __init__(self, path, flush_every=1):
+        self.path = path
+        self.flush_every = max(1, flush_every)
+        self._file = gzip.open(path, "at", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._unflushed = 0
+
+    def record(self, method, url, request_headers, request_body, status,
+               response_headers, response_body, elapsed):
+        entry = {
+            "ts": time.time(),
+            "method": method,
+            "url": url,
+            "request_headers": _redact(request_headers),
+            "request_body": request_body,
+            "status": status,
+            "response_headers": _redact(response_headers),
+            "response_body": response_body,
+            "elapsed": elapsed,
+        }
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._unflushed += 1
+            if self._unflushed >= self.flush_every:
+                self._file.flush()
+                self._unflushed = 0
+
+    # Record a transport response together with its measured latency
+    def record_response(self, response, elapsed):
+        request = response.request
+        # requests exposes the sent body as .body, httpx as .content
+        body = getattr(request, "body", None)
+        if body is None:
+            body = getattr(request, "content", None) or None
+        if isinstance(body, bytes):
+            body = body.decode("utf-8", errors="replace")
+        self.record(request.method, str(request.url), dict(request.headers), body,
+                    response.status_code, dict(response.headers),
+                    response.text, elapsed)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# Read every entry of a capture file. A capture cut short (recorder killed
+# mid-write) yields the complete entries before the damage.
+def load_records(path):
+    records = []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                # Only the last line can lack its newline: a partial write
+                if not line.endswith("\n"):
+                    break
+                if line.strip():
+                    records.append(json.loads(line))
+        except (EOFError, gzip.BadGzipFile):
+            pass
+    return records
+
+
+def _request_key(method, url):
+    parsed = urlparse(url)
+    path = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+    return method.upper(), path
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _replay(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+
+        entry = self.server.next_entry(self.command, self.path)
+        if entry is None:
+            body = json.dumps({"error": f"No recording for {self.command} {self.path}"}).encode()
+            status, headers = 404, {"Content-Type": "application/json"}
+        else:
+            time.sleep(entry["elapsed"] / self.server.speed)
+            body = (entry["response_body"] or "").encode("utf-8")
+            status = entry["status"]
+            headers = {name: value for name, value in entry["response_headers"].items()
+                       if name.lower() not in _HOP_HEADERS}
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_PUT = do_POST = do_DELETE = _replay
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+# Local HTTP server replaying a capture. Responses for the same method and
+# path are returned in recorded order and cycle once exhausted; `speed`
+# divides every recorded latency (2.0 replays twice as fast).
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, records, speed=1.0, verbose=False):
+        self.speed = speed
+        self.verbose = verbose
+        self._entries = {}
+        self._lock = threading.Lock()
+        for entry in records:
+            key = _request_key(entry["method"], entry["url"])
+            self._entries.setdefault(key, deque()).append(entry)
+        super().__init__(address, _ReplayHandler)
+
+    def next_entry(self, method, path):
+        with self._lock:
+            entries = self._entries.get(_request_key(method, path))
+            if not entries:
+                return None
+            entry = entries[0]
+            entries.rotate(-1)
+            return entry
+
+    # Base URL to hand to AccountClient so paths line up with the capture
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{urlparse(INVENTORY_API).path}"
+
+
+# Per-method count and latency percentiles for a capture
+def latency_summary(records):
+    by_method = {}
+    for entry in records:
+        by_method.setdefault(entry["method"], []).append(entry["elapsed"])
+    summary = {}
+    for method, values in sorted(by_method.items()):
+        values.sort()
+        summary[method] = {
+            "count": len(values),
+            "p50": values[int(0.50 * (len(values) - 1))],
+            "p95": values[int(0.95 * (len(values) - 1))],
+            "max": values[-1],
+        }
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inventory API traffic replay")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    replay = commands.add_parser("replay", help="serve a capture locally")
+    replay.add_argument("capture")
+    replay.add_argument("--host", default="127.0.0.1")
+    replay.add_argument("--port", type=int, default=8099)
+    replay.add_argument("--speed", type=float, default=1.0)
+
+    stats = commands.add_parser("stats", help="summarize capture latencies")
+    stats.add_argument("capture")
+
+    args = parser.parse_args(argv)
+    records = load_records(args.capture)
+
+    if args.command == "stats":
+        print(json.dumps(latency_summary(records), indent=2))
+        return 0
+
+    server = ReplayServer((args.host, args.port), records, speed=args.speed,
+                          verbose=True)
+    print(f"Replaying {len(records)} responses at {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,358 @@
+#!/usr/bin/env python
+# Columnar binary inventory snapshots with memory-mapped reads.
+#
+# File layout (little-endian, every column 8-byte aligned):
+#   magic "EBSNAP01" | uint64 rows | uint32 columns | uint32 reserved
+#   column table: columns x (16s name, 1s format, 7x pad, uint64 offset,
+#                            uint64 nbytes)
+#   column data
+#
+# Columns:
+#   sku_offsets      q  rows + 1 offsets into sku_data
+#   sku_data         B  UTF-8 SKUs back to back
+#   quantity         q  ship-to-location quantity
+#   fetched_at       d  unix time the row was captured
+#   payload_offsets  q  rows + 1 offsets into payload_data (optional)
+#   payload_data     B  raw get_stock JSON back to back (optional)
+#
+# Readers map the file and hand out zero-copy memoryviews per column, so
+# opening a large snapshot costs only the header parse and a scan touches
+# only the pages of the columns it reads.
+import argparse
+import csv
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+from array import array
+
+from ebay_inventory import stock_quantity
+
+MAGIC = b"EBSNAP01"
+_HEADER = struct.Struct("<8sQII")
+_COLUMN = struct.Struct("<16ss7xQQ")
+
+# Rows buffered in memory before each column is flushed to its spool file
+FLUSH_ROWS = 65536
+
+# Inventory items per page when exporting a whole account (API maximum)
+PAGE_SIZE = 200
+
+# Concurrent get_stock calls, and SKUs fetched per round, when exporting
+# an explicit SKU list
+EXPORT_WORKERS = 8
+EXPORT_CHUNK = 1024
+
+
+def _pad(n):
+    return -n % 8
+
+
+# Streams rows into per-column spool files and assembles the snapshot on
+# close, so memory use stays flat however many rows are written
+class SnapshotWriter:
+    def __init__(self, path, include_payload=False):
+        self.path = path
+        self.include_payload = include_payload
+        self.rows = 0
+        self._columns = {
+            "sku_offsets": "q",
+            "sku_data": "B",
+            "quantity": "q",
+            "fetched_at": "d",
+        }
+        if include_payload:
+            self._columns["payload_offsets"] = "q"
+            self._columns["payload_data"] = "B"
+        self._spools = {name: tempfile.TemporaryFile() for name in self._columns}
+        self._buffers = {name: array(fmt) for name, fmt in self._columns.items()}
+        self._sku_end = 0
+        self._payload_end = 0
+        self._buffers["sku_offsets"].append(0)
+        if include_payload:
+            self._buffers["payload_offsets"].append(0)
+
+    def add(self, sku, quantity, fetched_at=None, payload=None):
+        encoded = sku.encode("utf-8")
+        self._sku_end += len(encoded)
+        self._buffers["sku_data"].frombytes(encoded)
+        self._buffers["sku_offsets"].append(self._sku_end)
+        self._buffers["quantity"].append(quantity)
+        self._buffers["fetched_at"].append(
+            time.time() if fetched_at is None else fetched_at)
+        if self.include_payload:
+            if payload is None:
+                raw = b""
+            elif isinstance(payload, bytes):
+                raw = payload
+            else:
+                raw = json.dumps(payload, separators=(",", ":")).encode()
+            self._payload_end += len(raw)
+            self._buffers["payload_data"].frombytes(raw)
+            self._buffers["payload_offsets"].append(self._payload_end)
+        self.rows += 1
+        if self.rows % FLUSH_ROWS == 0:
+            self._flush()
+
+    # Add a row straight from a get_stock payload
+    def add_payload(self, data, fetched_at=None):
+        self.add(data["sku"], stock_quantity(data), fetched_at, data)
+
+    def _flush(self):
+        for name, buffer in self._buffers.items():
+            buffer.tofile(self._spools[name])
+            del buffer[:]
+
+    def close(self):
+        if self._spools is None:
+            return
+        self._flush()
+        names = list(self._columns)
+        table_end = _HEADER.size + _COLUMN.size * len(names)
+        offset = table_end + _pad(table_end)
+        table = []
+        for name in names:
+            nbytes = self._spools[name].tell()
+            table.append(_COLUMN.pack(name.encode(), self._columns[name].encode(),
+                                      offset, nbytes))
+            offset += nbytes + _pad(nbytes)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as out:
+            out.write(_HEADER.pack(MAGIC, self.rows, len(names), 0))
+            out.write(b"".join(table))
+            out.write(b"\0" * _pad(table_end))
+            for name in names:
+                spool = self._spools[name]
+                nbytes = spool.tell()
+                spool.seek(0)
+                shutil.copyfileobj(spool, out)
+                out.write(b"\0" * _pad(nbytes))
+                spool.close()
+        os.replace(tmp_path, self.path)
+        self._spools = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            for spool in self._spools.values():
+                spool.close()
+            self._spools = None
+
+
+# Memory-mapped, read-only view of a snapshot file
+class Snapshot:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        self._cache = {}
+        magic, self.rows, count, _ = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise Exception(f"Not an inventory snapshot: {path}")
+        self._table = {}
+        for i in range(count):
+            name, fmt, offset, nbytes = _COLUMN.unpack_from(
+                self._map, _HEADER.size + i * _COLUMN.size)
+            self._table[name.rstrip(b"\0").decode()] = (fmt.decode(), offset, nbytes)
+
+    def columns(self):
+        return list(self._table)
+
+    # Zero-copy memoryview of one column
+    def column(self, name):
+        if name not in self._cache:
+            if name not in self._table:
+                raise Exception(f"Snapshot has no column: {name}")
+            fmt, offset, nbytes = self._table[name]
+            self._cache[name] = self._view[offset:offset + nbytes].cast(fmt)
+        return self._cache[name]
+
+    # Zero-copy NumPy array of one column (needs numpy). It maps the file
+    # separately, so it stays valid after the snapshot is closed.
+    def array(self, name):
+        import numpy as np
+        column = self.column(name)
+        if not len(column):
+            return np.empty(0, dtype=column.format)
+        return np.memmap(self.path, dtype=column.format, mode="r",
+                         offset=self._table[name][1], shape=(len(column),))
+
+    @property
+    def quantities(self):
+        return self.column("quantity")
+
+    @property
+    def fetched_at(self):
+        return self.column("fetched_at")
+
+    def sku(self, row):
+        offsets = self.column("sku_offsets")
+        return bytes(self.column("sku_data")[offsets[row]:offsets[row + 1]]).decode("utf-8")
+
+    def skus(self):
+        offsets = self.column("sku_offsets")
+        data = self.column("sku_data")
+        for row in range(self.rows):
+            yield bytes(data[offsets[row]:offsets[row + 1]]).decode("utf-8")
+
+    # Raw get_stock JSON bytes for a row (empty if none was stored)
+    def payload(self, row):
+        offsets = self.column("payload_offsets")
+        return bytes(self.column("payload_data")[offsets[row]:offsets[row + 1]])
+
+    # {sku: quantity} for the whole snapshot, e.g. to feed reconciliation
+    def to_dict(self):
+        return dict(zip(self.skus(), self.quantities))
+
+    def __len__(self):
+        return self.rows
+
+    # Columns handed out earlier become unusable. If slices of them are
+    # still alive the map stays open until they are garbage collected.
+    def close(self):
+        for view in self._cache.values():
+            view.release()
+        self._cache = {}
+        self._view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# Every inventory item of the account, read page by page
+def iter_inventory_items(client, page_size=PAGE_SIZE):
+    offset = 0
+    while True:
+        page = client.get_inventory_items(limit=page_size, offset=offset)
+        items = page.get("inventoryItems", [])
+        yield from items
+        offset += len(items)
+        if not items or offset >= page.get("total", 0):
+            return
+
+
+# get_stock for each SKU on `workers` threads sharing the client's pool;
+# yields (sku, data, error) in input order
+def _fetch_stock(client, skus, workers):
+    def fetch(sku):
+        try:
+            return sku, client.get_stock(sku), None
+        except Exception as exc:
+            return sku, None, str(exc)
+
+    # Only exports pay for importing concurrent.futures
+    from concurrent.futures import ThreadPoolExecutor
+
+    skus = iter(skus)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            chunk = [sku for _, sku in zip(range(EXPORT_CHUNK), skus)]
+            if not chunk:
+                return
+            yield from executor.map(fetch, chunk)
+
+
+# Stream inventory into a snapshot. With skus=None the whole account is
+# read through the paged inventory_item listing (one call per PAGE_SIZE
+# items); otherwise each listed SKU is fetched concurrently, keeping rows
+# in input order. Returns (written, errors) where errors maps SKU to the
+# error message.
+def export_snapshot(client, skus, path, include_payload=False,
+                    workers=EXPORT_WORKERS):
+    errors = {}
+    with SnapshotWriter(path, include_payload=include_payload) as writer:
+        if skus is None:
+            for data in iter_inventory_items(client):
+                writer.add_payload(data)
+        else:
+            for sku, data, error in _fetch_stock(client, skus, workers):
+                if error is not None:
+                    errors[sku] = error
+                    continue
+                data.setdefault("sku", sku)
+                writer.add_payload(data)
+        written = writer.rows
+    return written, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inventory snapshots")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="fetch inventory into a snapshot")
+    export.add_argument("skus", nargs="?", default=None,
+                        help="file with one SKU per line ('-' for stdin); "
+                             "omit to export every inventory item")
+    export.add_argument("output")
+    export.add_argument("--workers", type=int, default=EXPORT_WORKERS,
+                        help="concurrent requests when exporting a SKU list")
+    export.add_argument("--payload", action="store_true",
+                        help="also store the raw get_stock JSON")
+    export.add_argument("--token", default=None)
+
+    info = commands.add_parser("info", help="show snapshot columns")
+    info.add_argument("snapshot")
+
+    dump = commands.add_parser("dump", help="write a snapshot as CSV")
+    dump.add_argument("snapshot")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        import ebay_inventory
+        from ebay_accounts import AccountClient
+
+        token = args.token or os.environ.get("EBAY_ACCESS_TOKEN",
+                                             ebay_inventory.ACCESS_TOKEN)
+        skus = None
+        if args.skus is not None:
+            source = sys.stdin if args.skus == "-" else open(args.skus)
+            with source:
+                skus = [line.strip() for line in source if line.strip()]
+        client = AccountClient("default", token,
+                               pool_size=max(10, args.workers))
+        try:
+            written, errors = export_snapshot(client, skus, args.output,
+                                              include_payload=args.payload,
+                                              workers=args.workers)
+        finally:
+            client.close()
+        for sku, message in errors.items():
+            sys.stderr.write(f"{sku}: {message}\n")
+        print(f"Wrote {written} rows to {args.output}")
+        return 1 if errors else 0
+
+    with Snapshot(args.snapshot) as snapshot:
+        if args.command == "info":
+            print(f"rows: {len(snapshot)}")
+            for name in snapshot.columns():
+                column = snapshot.column(name)
+                print(f"{name}: {column.format} x {len(column)}")
+        else:
+            writer = csv.writer(sys.stdout)
+            writer.writerow(["sku", "quantity", "fetched_at"])
+            writer.writerows(zip(snapshot.skus(), snapshot.quantities,
+                                 snapshot.fetched_at))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
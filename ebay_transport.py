@@ -0,0 +1,88 @@
+# Pluggable HTTP transports for AccountClient.
+#
+# A transport owns the connection pool and default headers and exposes
+# request(method, url, **kwargs) returning a response with status_code,
+# text, json(), headers and request. Both transports ask for gzip/deflate
+# and hand back decoded bodies.
+#
+#   RequestsTransport  HTTP/1.1 keep-alive via a requests.Session
+#   Http2Transport     HTTP/2 via httpx: concurrent calls from many threads
+#                      are multiplexed as streams over a few connections
+#                      (needs `pip install "httpx[http2]"`)
+from abc import ABC, abstractmethod
+
+from ebay_lazy import lazy_import
+
+requests = lazy_import("requests")
+
+# Response encodings every transport negotiates
+ACCEPT_ENCODING = "gzip, deflate"
+
+
+# Base class for transports; subclasses must implement request()
+class Transport(ABC):
+    @abstractmethod
+    def request(self, method, url, **kwargs):
+        pass
+
+    def close(self):
+        pass
+
+
+class RequestsTransport(Transport):
+    def __init__(self, headers=None, pool_size=10, pool_block=False):
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size,
+            pool_block=pool_block)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+        self.session.headers.update(headers or {})
+
+    def request(self, method, url, **kwargs):
+        return self.session.request(method, url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+class Http2Transport(Transport):
+    # pool_size caps connections per host; each carries many streams.
+    # prior_knowledge speaks HTTP/2 straight away on plain http:// URLs
+    # (h2c), which local stand-ins and proxies often need.
+    def __init__(self, headers=None, pool_size=2, timeout=30.0,
+                 prior_knowledge=False):
+        try:
+            import httpx
+            self.client = httpx.Client(
+                http2=True,
+                http1=not prior_knowledge,
+                limits=httpx.Limits(max_connections=pool_size),
+                headers={"Accept-Encoding": ACCEPT_ENCODING, **(headers or {})},
+                timeout=timeout,
+            )
+        except ImportError:
+            raise Exception(
+                "Http2Transport requires httpx with HTTP/2 support: "
+                "pip install 'httpx[http2]'")
+
+    def request(self, method, url, **kwargs):
+        return self.client.request(method, url, **kwargs)
+
+    def close(self):
+        self.client.close()
+
+
+# Transport names accepted by AccountClient and AccountRegistry
+TRANSPORTS = {
+    "requests": RequestsTransport,
+    "http2": Http2Transport,
+}
+
+
+# Build a transport from a name in TRANSPORTS
+def create_transport(name, headers=None, pool_size=10):
+    if name not in TRANSPORTS:
+        raise Exception(f"Unknown transport: {name}")
+    return TRANSPORTS[name](headers=headers, pool_size=pool_size)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# Thin client for the ebay_daemon socket API.
+#
+# Deliberately imports nothing beyond the standard library basics so that
+# short-lived shell and cron jobs start in milliseconds; all HTTP work
+# happens in the long-running daemon.
+import json
+import os
+import socket
+import sys
+
+
+# Per-user socket location: $XDG_RUNTIME_DIR when set, else a private
+# directory under the home directory (never a shared path such as /tmp)
+def default_socket_path():
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "ebay_inventory.sock")
+    return os.path.join(os.path.expanduser("~"), ".ebay_inventory", "daemon.sock")
+
+
+# Where the daemon listens unless told otherwise
+DEFAULT_SOCKET = os.environ.get("EBAY_DAEMON_SOCKET") or default_socket_path()
+
+USAGE = """usage: ebayctl.py [--socket PATH] COMMAND [ARGS]
+
+commands:
+  ping                      check the daemon is alive
+  get SKU                   print stock for SKU
+  set SKU QUANTITY          update stock for SKU
+  bulk-get SKU [SKU ...]    print stock for several SKUs
+  bulk-set SKU=QTY [...]    update stock for several SKUs
+  invalidate SKU [SKU ...]  drop SKUs from the daemon cache
+  stats                     print daemon cache statistics
+"""
+
+
+# Send one request to the daemon and return its result
+def call(op, *args, socket_path=DEFAULT_SOCKET, timeout=None):
+    # Only talk to a daemon run by the same user, so a socket planted by
+    # someone else cannot feed us fake stock data
+    if os.stat(socket_path).st_uid != os.getuid():
+        raise Exception(f"{socket_path} is not owned by the current user")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall(json.dumps({"op": op, "args": list(args)}).encode() + b"\n")
+        with sock.makefile("rb") as stream:
+            line = stream.readline()
+    if not line:
+        raise Exception("Daemon closed the connection")
+    reply = json.loads(line)
+    if not reply.get("ok"):
+        raise Exception(reply.get("error", "Unknown daemon error"))
+    return reply.get("result")
+
+
+def _parse_quantities(pairs):
+    quantities = {}
+    for pair in pairs:
+        sku, sep, quantity = pair.rpartition("=")
+        if not sep or not sku:
+            raise ValueError(f"Expected SKU=QTY, got {pair!r}")
+        quantities[sku] = int(quantity)
+    return quantities
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    socket_path = DEFAULT_SOCKET
+    if len(argv) >= 2 and argv[0] == "--socket":
+        socket_path = argv[1]
+        argv = argv[2:]
+    if not argv or argv[0] in ("-h", "--help"):
+        sys.stdout.write(USAGE)
+        return 0 if argv else 2
+
+    command, args = argv[0], argv[1:]
+    try:
+        if command == "ping" and not args:
+            result = call("ping", socket_path=socket_path)
+        elif command == "get" and len(args) == 1:
+            result = call("get_stock", args[0], socket_path=socket_path)
+        elif command == "set" and len(args) == 2:
+            result = call("update_stock", args[0], int(args[1]),
+                          socket_path=socket_path)
+        elif command == "bulk-get" and args:
+            result = call("bulk_get_stock", args, socket_path=socket_path)
+        elif command == "bulk-set" and args:
+            result = call("bulk_update_stock", _parse_quantities(args),
+                          socket_path=socket_path)
+        elif command == "invalidate" and args:
+            result = call("invalidate", args, socket_path=socket_path)
+        elif command == "stats" and not args:
+            result = call("stats", socket_path=socket_path)
+        else:
+            sys.stderr.write(USAGE)
+            return 2
+    except Exception as exc:
+        sys.stderr.write(f"ebayctl: {exc}\n")
+        return 1
+
+    if result is not None:
+        sys.stdout.write(json.dumps(result, indent=2, sort_keys=True) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
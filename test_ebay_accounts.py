@@ -0,0 +1,310 @@
+"""
+Unit tests for ebay_accounts.py
+
+This test suite covers:
+- RateLimiter spacing
+- AccountClient request construction and error handling
+- AccountRegistry lookups and per-process client caching
+- run_sharded grouping, merging of results and errors
+"""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch, Mock
+
+import pytest
+
+from ebay_accounts import (
+    AccountClient,
+    AccountRegistry,
+    RateLimiter,
+    run_sharded,
+)
+from ebay_inventory import INVENTORY_API, build_headers
+
+
+def make_response(status_code, data=None, text=""):
+    response = Mock()
+    response.status_code = status_code
+    response.json.return_value = data
+    response.text = text
+    return response
+
+
+class TestRateLimiter:
+    """Test suite for RateLimiter"""
+
+    def test_no_limit_never_sleeps(self):
+        """Test that an unlimited limiter does not sleep"""
+        limiter = RateLimiter()
+
+        with patch('ebay_accounts.time.sleep') as mock_sleep:
+            for _ in range(5):
+                limiter.wait()
+            mock_sleep.assert_not_called()
+
+    def test_limit_spaces_calls(self):
+        """Test that consecutive calls are delayed by the interval"""
+        limiter = RateLimiter(max_per_second=2)
+
+        with patch('ebay_accounts.time.monotonic', return_value=100.0), \
+                patch('ebay_accounts.time.sleep') as mock_sleep:
+            limiter.wait()
+            limiter.wait()
+
+            mock_sleep.assert_called_once_with(0.5)
+
+
+class TestAccountClient:
+    """Test suite for AccountClient"""
+
+    def test_client_sets_account_token_on_session(self):
+        """Test that the account token is used for the session headers"""
+        client = AccountClient("acct-1", "TOKEN-1")
+
+        assert client.session.headers['Authorization'] == 'Bearer TOKEN-1'
+        assert client.session.headers['Content-Type'] == 'application/json'
+
+    def test_get_stock_success(self):
+        """Test get_stock returns the decoded payload"""
+        client = AccountClient("acct-1", "TOKEN-1")
+        data = {"sku": "SKU1"}
+
+        with patch.object(client.session, 'request',
+                          return_value=make_response(200, data)) as mock_request:
+            assert client.get_stock("SKU1") == data
+            mock_request.assert_called_once_with(
+                "GET", f"{INVENTORY_API}/inventory_item/SKU1",
+                headers=build_headers("TOKEN-1"))
+
+    def test_get_stock_error(self):
+        """Test get_stock raises on non-200 responses"""
+        client = AccountClient("acct-1", "TOKEN-1")
+
+        with patch.object(client.session, 'request',
+                          return_value=make_response(404, text="Not found")):
+            with pytest.raises(Exception) as exc_info:
+                client.get_stock("SKU1")
+
+        assert "Error fetching stock: Not found" in str(exc_info.value)
+
+    def test_update_stock_sends_payload(self):
+        """Test update_stock sends the stock payload"""
+        client = AccountClient("acct-1", "TOKEN-1")
+
+        with patch.object(client.session, 'request',
+                          return_value=make_response(204)) as mock_request:
+            client.update_stock("SKU1", 7)
+
+            body = mock_request.call_args[1]['json']
+            assert body['availability']['ship_to_location_availability']['quantity'] == 7
+
+    def test_update_stock_error(self):
+        """Test update_stock raises on failure"""
+        client = AccountClient("acct-1", "TOKEN-1")
+
+        with patch.object(client.session, 'request',
+                          return_value=make_response(400, text="Bad")):
+            with pytest.raises(Exception) as exc_info:
+                client.update_stock("SKU1", 7)
+
+        assert "Error updating stock: Bad" in str(exc_info.value)
+
+    def test_custom_base_url(self):
+        """Test requests go to the configured base URL"""
+        client = AccountClient("acct-1", "TOKEN-1", base_url="http://localhost:1")
+
+        with patch.object(client.session, 'request',
+                          return_value=make_response(200, {})) as mock_request:
+            client.get_stock("SKU1")
+            assert mock_request.call_args[0][1] == "http://localhost:1/inventory_item/SKU1"
+
+
+class TestAccountRegistry:
+    """Test suite for AccountRegistry"""
+
+    def test_register_and_list_accounts(self):
+        """Test registered accounts are listed in order"""
+        registry = AccountRegistry()
+        registry.register("a", "TA")
+        registry.register("b", "TB", max_per_second=5)
+
+        assert registry.accounts() == ["a", "b"]
+        assert registry.config("b")["max_per_second"] == 5
+
+    def test_unknown_account_raises(self):
+        """Test looking up an unknown account raises"""
+        registry = AccountRegistry()
+
+        with pytest.raises(Exception) as exc_info:
+            registry.client("missing")
+
+        assert "Unknown account: missing" in str(exc_info.value)
+
+    def test_client_is_cached(self):
+        """Test the same client is returned for repeated lookups"""
+        registry = AccountRegistry()
+        registry.register("a", "TA")
+
+        assert registry.client("a") is registry.client("a")
+
+    def test_client_not_shared_after_fork(self):
+        """Test clients are rebuilt when the process id changes"""
+        registry = AccountRegistry()
+        registry.register("a", "TA")
+        first = registry.client("a")
+
+        with patch('ebay_accounts.os.getpid', return_value=-1):
+            assert registry.client("a") is not first
+
+    def test_reregister_drops_cached_client(self):
+        """Test re-registering an account rebuilds its client"""
+        registry = AccountRegistry()
+        registry.register("a", "TA")
+        first = registry.client("a")
+        registry.register("a", "TA2")
+
+        assert registry.client("a") is not first
+
+
+class TestRunSharded:
+    """Test suite for run_sharded"""
+
+    def setup_method(self):
+        self.registry = AccountRegistry()
+        self.registry.register("a", "TA")
+        self.registry.register("b", "TB", max_per_second=10)
+
+    def test_results_are_merged_in_order(self):
+        """Test results from all shards come back in input order"""
+        def fake_request(self, method, url, **kwargs):
+            sku = url.rsplit("/", 1)[1]
+            return make_response(200, {"sku": sku,
+                                       "token": self.headers['Authorization']})
+
+        operations = [
+            ("a", "get_stock", "A1"),
+            ("b", "get_stock", "B1"),
+            ("a", "get_stock", "A2"),
+        ]
+
+        with patch('requests.Session.request', fake_request), \
+                ThreadPoolExecutor(max_workers=2) as executor:
+            results, errors = run_sharded(self.registry, operations,
+                                          executor=executor)
+
+        assert errors == {}
+        assert [r["sku"] for r in results] == ["A1", "B1", "A2"]
+        assert results[0]["token"] == "Bearer TA"
+        assert results[1]["token"] == "Bearer TB"
+
+    def test_errors_are_collected_per_operation(self):
+        """Test failing operations are reported without aborting others"""
+        def fake_request(self, method, url, **kwargs):
+            if url.endswith("BAD"):
+                return make_response(500, text="boom")
+            return make_response(204)
+
+        operations = [
+            ("a", "update_stock", "OK", 1),
+            ("a", "update_stock", "BAD", 2),
+            ("missing", "get_stock", "X"),
+            ("b", "delete_everything", "X"),
+        ]
+
+        with patch('requests.Session.request', fake_request), \
+                ThreadPoolExecutor(max_workers=2) as executor:
+            results, errors = run_sharded(self.registry, operations,
+                                          executor=executor)
+
+        assert results == [None, None, None, None]
+        assert errors[1] == "Error updating stock: boom"
+        assert errors[2] == "Unknown account: missing"
+        assert errors[3] == "Unsupported operation: delete_everything"
+        assert 0 not in errors
+
+    def test_account_split_divides_rate_limit(self):
+        """Test spare workers split an account and share its quota"""
+        submitted = []
+
+        executor = Mock()
+        executor.submit.side_effect = lambda fn, config, ops: submitted.append(
+            (config, ops)) or Mock(result=Mock(return_value=([], [])))
+
+        operations = [("b", "get_stock", f"B{i}") for i in range(4)]
+        run_sharded(self.registry, operations, max_workers=2,
+                    executor=executor)
+
+        assert len(submitted) == 2
+        assert all(config["max_per_second"] == 5 for config, _ in submitted)
+        indexes = sorted(i for _, ops in submitted for i, _, _ in ops)
+        assert indexes == [0, 1, 2, 3]
+
+    def test_same_sku_stays_in_one_shard_in_order(self):
+        """Test operations on one SKU are never split across shards"""
+        submitted = []
+
+        executor = Mock()
+        executor.submit.side_effect = lambda fn, config, ops: submitted.append(
+            ops) or Mock(result=Mock(return_value=([], [])))
+
+        operations = []
+        for i in range(20):
+            operations += [("a", "update_stock", f"SKU{i}", 5),
+                           ("a", "update_stock", f"SKU{i}", 3),
+                           ("a", "get_stock", f"SKU{i}")]
+        run_sharded(self.registry, operations, max_workers=4, executor=executor)
+
+        assert len(submitted) > 1
+        shard_of = {}
+        for number, ops in enumerate(submitted):
+            indexes = [index for index, _, _ in ops]
+            assert indexes == sorted(indexes)
+            for index, name, args in ops:
+                assert shard_of.setdefault(args[0], number) == number
+        assert len(shard_of) == 20
+
+    def test_empty_workload(self):
+        """Test an empty workload returns without starting workers"""
+        assert run_sharded(self.registry, []) == ([], {})
+
+    def test_process_pool_against_local_server(self):
+        """Test the default process pool against a local stand-in API"""
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps({
+                    "sku": self.path.rsplit("/", 1)[1],
+                    "auth": self.headers['Authorization'],
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+        registry = AccountRegistry()
+        registry.register("a", "TA", base_url=base_url)
+        registry.register("b", "TB", base_url=base_url)
+        operations = [("a", "get_stock", "A1"), ("b", "get_stock", "B1")]
+
+        try:
+            results, errors = run_sharded(registry, operations, max_workers=2)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert errors == {}
+        assert results == [
+            {"sku": "A1", "auth": "Bearer TA"},
+            {"sku": "B1", "auth": "Bearer TB"},
+        ]
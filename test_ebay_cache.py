@@ -0,0 +1,80 @@
+"""
+Unit tests for ebay_cache.py
+
+This test suite covers:
+- Cache hits, misses and expiry
+- In-place quantity updates and invalidation
+"""
+
+from unittest.mock import patch
+
+from conftest import stock_payload
+from ebay_cache import StockCache
+
+
+class TestStockCache:
+    """Test suite for StockCache"""
+
+    def test_put_then_get(self):
+        """Test a cached payload is returned and counted as a hit"""
+        cache = StockCache(ttl=60)
+        cache.put("SKU1", stock_payload("SKU1", 3))
+
+        assert cache.get("SKU1") == stock_payload("SKU1", 3)
+        assert cache.stats() == {"entries": 1, "hits": 1, "misses": 0}
+
+    def test_missing_sku_is_a_miss(self):
+        """Test an uncached SKU returns None"""
+        cache = StockCache()
+
+        assert cache.get("SKU1") is None
+        assert cache.misses == 1
+
+    def test_expired_entry_is_dropped(self):
+        """Test entries older than the TTL are evicted on read"""
+        cache = StockCache(ttl=10)
+
+        with patch('ebay_cache.time.monotonic', return_value=100.0):
+            cache.put("SKU1", stock_payload("SKU1", 3))
+        with patch('ebay_cache.time.monotonic', return_value=111.0):
+            assert cache.get("SKU1") is None
+
+        assert len(cache) == 0
+
+    def test_set_quantity_updates_cached_payload(self):
+        """Test set_quantity rewrites the cached quantity"""
+        cache = StockCache()
+        original = stock_payload("SKU1", 3)
+        cache.put("SKU1", original)
+
+        assert cache.set_quantity("SKU1", 9) is True
+        assert cache.get("SKU1")["availability"]["ship_to_location_availability"]["quantity"] == 9
+        assert original["availability"]["ship_to_location_availability"]["quantity"] == 3
+
+    def test_set_quantity_refuses_older_data(self):
+        """Test a quantity older than the cached data is not applied"""
+        cache = StockCache()
+        cache.put("SKU1", stock_payload("SKU1", 3), as_of=100.0)
+
+        assert cache.set_quantity("SKU1", 9, as_of=99.0) is False
+        assert cache.get("SKU1")["availability"]["ship_to_location_availability"]["quantity"] == 3
+        assert cache.set_quantity("SKU1", 9, as_of=101.0) is True
+        assert cache.set_quantity("SKU1", 7, as_of=100.5) is False
+
+    def test_set_quantity_on_uncached_sku(self):
+        """Test set_quantity reports SKUs that are not cached"""
+        cache = StockCache()
+
+        assert cache.set_quantity("SKU1", 9) is False
+        assert cache.get("SKU1") is None
+
+    def test_invalidate_and_clear(self):
+        """Test invalidate removes one SKU and clear removes all"""
+        cache = StockCache()
+        cache.put("SKU1", stock_payload("SKU1", 1))
+        cache.put("SKU2", stock_payload("SKU2", 2))
+
+        assert cache.invalidate("SKU1") is True
+        assert cache.invalidate("SKU1") is False
+        cache.clear()
+        assert len(cache) == 0
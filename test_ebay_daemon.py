@@ -0,0 +1,312 @@
+"""
+Unit tests for ebay_daemon.py and ebayctl.py
+
+This test suite covers:
+- InventoryService dispatch, caching and per-SKU bulk errors
+- Round trips over a real Unix domain socket
+- The ebayctl command line client
+- ebayctl staying free of heavy imports
+"""
+
+import gzip
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+
+from conftest import stock_payload
+import ebay_daemon
+import ebayctl
+from ebay_cache import StockCache
+from ebay_daemon import InventoryDaemon, InventoryService
+
+
+def make_client():
+    client = Mock()
+    client.get_stock.side_effect = lambda sku: stock_payload(sku, 5)
+    client.update_stock.return_value = None
+    return client
+
+
+class TestInventoryService:
+    """Test suite for InventoryService"""
+
+    def test_get_stock_is_cached(self):
+        """Test repeated reads are served from the cache"""
+        client = make_client()
+        service = InventoryService(client)
+
+        assert service.get_stock("SKU1") == stock_payload("SKU1", 5)
+        assert service.get_stock("SKU1") == stock_payload("SKU1", 5)
+        client.get_stock.assert_called_once_with("SKU1")
+
+    def test_fresh_read_bypasses_cache(self):
+        """Test fresh=True always calls the API"""
+        client = make_client()
+        service = InventoryService(client)
+
+        service.get_stock("SKU1")
+        service.get_stock("SKU1", True)
+        assert client.get_stock.call_count == 2
+
+    def test_update_stock_refreshes_cached_quantity(self):
+        """Test a write updates the cached quantity"""
+        client = make_client()
+        service = InventoryService(client)
+        service.get_stock("SKU1")
+
+        service.update_stock("SKU1", 8)
+
+        client.update_stock.assert_called_once_with("SKU1", 8)
+        assert service.get_stock("SKU1")["availability"]["ship_to_location_availability"]["quantity"] == 8
+        client.get_stock.assert_called_once()
+
+    def test_bulk_get_reports_errors_per_sku(self):
+        """Test one failing SKU does not fail the whole bulk call"""
+        client = make_client()
+
+        def get_stock(sku):
+            if sku == "BAD":
+                raise Exception("Error fetching stock: Not found")
+            return stock_payload(sku, 1)
+
+        client.get_stock.side_effect = get_stock
+        service = InventoryService(client)
+
+        result = service.bulk_get_stock(["A", "BAD"])
+
+        assert result["A"] == {"ok": True, "result": stock_payload("A", 1)}
+        assert result["BAD"] == {"ok": False,
+                                 "error": "Error fetching stock: Not found"}
+
+    def test_bulk_update(self):
+        """Test bulk_update_stock writes every SKU"""
+        client = make_client()
+        service = InventoryService(client)
+
+        result = service.bulk_update_stock({"A": 1, "B": 2})
+
+        assert result == {"A": {"ok": True, "result": None},
+                          "B": {"ok": True, "result": None}}
+        assert client.update_stock.call_count == 2
+
+    def test_handle_unknown_operation(self):
+        """Test unknown operations produce an error reply"""
+        service = InventoryService(make_client())
+
+        assert service.handle({"op": "drop_tables"}) == {
+            "ok": False, "error": "Unsupported operation: drop_tables"}
+
+    def test_handle_invalidate_and_stats(self):
+        """Test invalidate and stats operations"""
+        service = InventoryService(make_client(), StockCache())
+        service.get_stock("SKU1")
+
+        assert service.handle({"op": "invalidate", "args": [["SKU1", "X"]]}) == {
+            "ok": True, "result": ["SKU1"]}
+        assert service.handle({"op": "stats"})["result"]["entries"] == 0
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    socket_path = str(tmp_path / "inventory.sock")
+    client = make_client()
+    server = InventoryDaemon(socket_path, InventoryService(client))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield socket_path, client
+    server.shutdown()
+    server.server_close()
+
+
+class TestSocketApi:
+    """Round trips through a live daemon socket"""
+
+    def test_ping(self, daemon):
+        """Test the daemon answers ping"""
+        socket_path, _ = daemon
+
+        assert ebayctl.call("ping", socket_path=socket_path) == "pong"
+
+    def test_get_and_update(self, daemon):
+        """Test get_stock and update_stock over the socket"""
+        socket_path, client = daemon
+
+        assert ebayctl.call("get_stock", "SKU1",
+                            socket_path=socket_path) == stock_payload("SKU1", 5)
+        ebayctl.call("update_stock", "SKU1", 3, socket_path=socket_path)
+
+        client.update_stock.assert_called_once_with("SKU1", 3)
+
+    def test_error_is_raised_client_side(self, daemon):
+        """Test daemon errors surface as exceptions in the client"""
+        socket_path, client = daemon
+        client.get_stock.side_effect = Exception("Error fetching stock: boom")
+
+        with pytest.raises(Exception) as exc_info:
+            ebayctl.call("get_stock", "SKU1", socket_path=socket_path)
+
+        assert "Error fetching stock: boom" in str(exc_info.value)
+
+    def test_socket_is_private_and_removed(self, tmp_path):
+        """Test the socket is owner-only and cleaned up on close"""
+        socket_path = str(tmp_path / "private.sock")
+        server = InventoryDaemon(socket_path, InventoryService(make_client()))
+
+        assert os.stat(socket_path).st_mode & 0o777 == 0o600
+        server.server_close()
+        assert not os.path.exists(socket_path)
+
+    def test_refuses_to_replace_running_daemon(self, daemon):
+        """Test a second daemon cannot steal a live socket"""
+        socket_path, _ = daemon
+
+        with pytest.raises(Exception) as exc_info:
+            InventoryDaemon(socket_path, InventoryService(make_client()))
+
+        assert "already listening" in str(exc_info.value)
+
+    def test_stale_socket_is_replaced(self, tmp_path):
+        """Test a leftover socket file from a dead daemon is removed"""
+        socket_path = str(tmp_path / "stale.sock")
+        InventoryDaemon(socket_path, InventoryService(make_client())).socket.close()
+
+        server = InventoryDaemon(socket_path, InventoryService(make_client()))
+        server.server_close()
+
+    def test_refuses_to_replace_regular_file(self, tmp_path):
+        """Test a --socket path pointing at a regular file is left alone"""
+        socket_path = tmp_path / "notes.txt"
+        socket_path.write_text("keep me")
+
+        with pytest.raises(Exception) as exc_info:
+            InventoryDaemon(str(socket_path), InventoryService(make_client()))
+
+        assert "not a socket" in str(exc_info.value)
+        assert socket_path.read_text() == "keep me"
+
+    def test_creates_private_socket_directory(self, tmp_path):
+        """Test a missing socket directory is created owner-only"""
+        socket_path = tmp_path / "run" / "inventory.sock"
+        server = InventoryDaemon(str(socket_path), InventoryService(make_client()))
+        server.server_close()
+
+        assert os.stat(socket_path.parent).st_mode & 0o777 == 0o700
+
+
+class TestDaemonMain:
+    """Test suite for the daemon command line"""
+
+    def test_refuses_public_notify_host(self, tmp_path, capsys):
+        """Test unverified notifications cannot be exposed off-host"""
+        socket_path = str(tmp_path / "inventory.sock")
+
+        with pytest.raises(SystemExit):
+            ebay_daemon.main(["--socket", socket_path, "--notify-port", "0",
+                              "--notify-host", "0.0.0.0"])
+
+        assert "loopback" in capsys.readouterr().err
+        assert not os.path.exists(socket_path)
+
+    def test_failed_bind_closes_client_and_capture(self, tmp_path):
+        """Test startup errors still release the client and capture file"""
+        socket_path = tmp_path / "notes.txt"
+        socket_path.write_text("keep me")
+
+        with patch('ebay_recorder.Recorder') as recorder_class, \
+                patch('ebay_daemon.AccountClient') as client_class:
+            with pytest.raises(Exception) as exc_info:
+                ebay_daemon.main(["--socket", str(socket_path), "--token", "T",
+                                  "--record", str(tmp_path / "traffic.jsonl.gz")])
+
+        assert "not a socket" in str(exc_info.value)
+        recorder_class.return_value.close.assert_called_once()
+        client_class.return_value.close.assert_called_once()
+        assert socket_path.read_text() == "keep me"
+
+    def test_sigterm_cleans_up(self, tmp_path):
+        """Test SIGTERM removes the socket and closes the capture"""
+        socket_path = str(tmp_path / "inventory.sock")
+        capture = str(tmp_path / "traffic.jsonl.gz")
+        process = subprocess.Popen(
+            [sys.executable, "ebay_daemon.py", "--socket", socket_path,
+             "--token", "T", "--record", capture],
+            cwd=os.path.dirname(os.path.abspath(ebay_daemon.__file__)),
+            stdout=subprocess.PIPE)
+        try:
+            assert process.stdout.readline().startswith(b"Listening on")
+            process.send_signal(signal.SIGTERM)
+            assert process.wait(timeout=10) == 0
+        finally:
+            process.kill()
+            process.stdout.close()
+
+        assert not os.path.exists(socket_path)
+        with gzip.open(capture, "rt") as f:
+            assert f.read() == ""
+
+
+class TestEbayctl:
+    """Test suite for the ebayctl command line"""
+
+    def test_get_command(self, daemon, capsys):
+        """Test `get` prints the stock payload as JSON"""
+        socket_path, _ = daemon
+
+        assert ebayctl.main(["--socket", socket_path, "get", "SKU1"]) == 0
+        assert json.loads(capsys.readouterr().out) == stock_payload("SKU1", 5)
+
+    def test_bulk_set_command(self, daemon, capsys):
+        """Test `bulk-set` parses SKU=QTY pairs"""
+        socket_path, client = daemon
+
+        assert ebayctl.main(["--socket", socket_path, "bulk-set",
+                             "A=1", "B=2"]) == 0
+        assert sorted(c.args for c in client.update_stock.call_args_list) == [
+            ("A", 1), ("B", 2)]
+
+    def test_bad_arguments(self, capsys):
+        """Test malformed commands print usage"""
+        assert ebayctl.main(["set", "SKU1"]) == 2
+        assert "usage" in capsys.readouterr().err
+
+    def test_missing_daemon(self, tmp_path, capsys):
+        """Test a clear error when no daemon is running"""
+        socket_path = str(tmp_path / "nobody.sock")
+
+        assert ebayctl.main(["--socket", socket_path, "ping"]) == 1
+        assert capsys.readouterr().err.startswith("ebayctl:")
+
+    def test_default_socket_is_per_user(self, monkeypatch):
+        """Test the default socket avoids shared directories"""
+        monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+        assert ebayctl.default_socket_path() == "/run/user/1000/ebay_inventory.sock"
+
+        monkeypatch.delenv("XDG_RUNTIME_DIR")
+        monkeypatch.setenv("HOME", "/home/seller")
+        assert ebayctl.default_socket_path() == "/home/seller/.ebay_inventory/daemon.sock"
+
+    def test_refuses_socket_owned_by_another_user(self, daemon):
+        """Test ebayctl will not talk to another user's socket"""
+        socket_path, client = daemon
+
+        with patch('ebayctl.os.getuid', return_value=os.getuid() + 1):
+            with pytest.raises(Exception) as exc_info:
+                ebayctl.call("get_stock", "SKU1", socket_path=socket_path)
+
+        assert "not owned by the current user" in str(exc_info.value)
+        client.get_stock.assert_not_called()
+
+    def test_client_does_not_import_requests(self):
+        """Test the thin client stays free of the HTTP stack"""
+        code = "import sys, ebayctl; print('requests' in sys.modules)"
+        output = subprocess.check_output(
+            [sys.executable, "-c", code],
+            cwd=os.path.dirname(os.path.abspath(ebayctl.__file__)))
+
+        assert output.strip() == b"False"
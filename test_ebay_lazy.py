@@ -0,0 +1,80 @@
+"""
+Unit tests for ebay_lazy.py and the import-time budget
+
+This test suite covers:
+- LazyModule deferring imports until first attribute access
+- Patching through a lazy module with unittest.mock
+- Every budgeted module importing without heavy dependencies
+- Import-time budgets, only when EBAY_IMPORT_BUDGET=1 (timing is machine-dependent)
+"""
+
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+import bench_import
+from ebay_lazy import LazyModule, lazy_import
+
+
+class TestLazyModule:
+    """Test suite for LazyModule and lazy_import"""
+
+    def test_loaded_on_first_access(self):
+        """Test the target module is imported on first attribute access"""
+        with patch('ebay_lazy.importlib.import_module',
+                   return_value=sys.modules['json']) as mock_import:
+            module = LazyModule("json")
+            mock_import.assert_not_called()
+
+            assert module.dumps([1]) == "[1]"
+            assert module.loads("2") == 2
+            mock_import.assert_called_once_with("json")
+
+    def test_already_imported_module_is_returned(self):
+        """Test no stand-in is created for modules already imported"""
+        assert lazy_import("json") is sys.modules["json"]
+
+    def test_missing_module_fails_on_use(self):
+        """Test a missing dependency raises only when used"""
+        module = lazy_import("ebay_no_such_dependency")
+
+        with pytest.raises(ImportError):
+            module.anything
+
+    def test_patch_through_lazy_module(self):
+        """Test attributes patched on the stand-in shadow the real module"""
+        module = LazyModule("json")
+
+        with patch.object(module, 'dumps', return_value="patched"):
+            assert module.dumps([1]) == "patched"
+        assert module.dumps([1]) == "[1]"
+
+    def test_repr_reports_state(self):
+        """Test the repr shows whether the module was loaded"""
+        module = LazyModule("json")
+
+        assert "not loaded" in repr(module)
+        module.dumps
+        assert "(loaded)" in repr(module)
+
+
+class TestImportBudget:
+    """Import-time regression checks"""
+
+    @pytest.mark.parametrize("module", sorted(bench_import.IMPORT_BUDGET_US))
+    def test_module_defers_heavy_imports(self, module):
+        """Test importing the module skips heavy deps"""
+        ((name, median, budget, loaded),) = bench_import.check([module], runs=1)
+
+        assert loaded == []
+
+    @pytest.mark.skipif(os.environ.get("EBAY_IMPORT_BUDGET") != "1",
+                        reason="set EBAY_IMPORT_BUDGET=1 to check import timings")
+    @pytest.mark.parametrize("module", sorted(bench_import.IMPORT_BUDGET_US))
+    def test_module_import_in_budget(self, module):
+        """Test the module's median import time stays within budget"""
+        ((name, median, budget, loaded),) = bench_import.check([module], runs=5)
+
+        assert median <= budget
@@ -0,0 +1,253 @@
+"""
+Unit tests for ebay_locations.py
+
+This test suite covers:
+- Merchant location caching, paging and expiry
+- Local aggregation of per-location availability
+- Batched bulkUpdatePriceQuantity calls and per-SKU error handling
+- AccountClient location and bulk endpoints
+"""
+
+from unittest.mock import Mock, patch
+
+import pytest
+
+from ebay_accounts import AccountClient
+from ebay_inventory import INVENTORY_API, build_headers
+from ebay_locations import (
+    BULK_LIMIT,
+    LocationCache,
+    aggregate_availability,
+    build_location_request,
+    location_cache,
+    update_location_stock,
+)
+
+
+def location(key, status="ENABLED"):
+    return {"merchantLocationKey": key, "merchantLocationStatus": status}
+
+
+def make_client(locations=("WH1", "WH2")):
+    client = Mock()
+    client.get_locations.return_value = {
+        "locations": [location(key) for key in locations],
+        "total": len(locations),
+    }
+    client.bulk_update_price_quantity.side_effect = lambda batch: [
+        {"sku": request["sku"], "statusCode": 200} for request in batch]
+    return client
+
+
+class TestLocationCache:
+    """Test suite for LocationCache"""
+
+    def test_locations_are_cached(self):
+        """Test the location list is fetched once within the TTL"""
+        client = make_client()
+        cache = LocationCache(client)
+
+        assert cache.enabled_keys() == {"WH1", "WH2"}
+        assert cache.enabled_keys() == {"WH1", "WH2"}
+        client.get_locations.assert_called_once()
+
+    def test_pages_through_locations(self):
+        """Test every page of locations is fetched"""
+        client = Mock()
+        client.get_locations.side_effect = [
+            {"locations": [location("A"), location("B")], "total": 3},
+            {"locations": [location("C")], "total": 3},
+        ]
+
+        assert [l["merchantLocationKey"] for l in LocationCache(client).locations()] == [
+            "A", "B", "C"]
+        assert client.get_locations.call_args_list[1][1]["offset"] == 2
+
+    def test_disabled_locations_are_excluded(self):
+        """Test disabled locations cannot receive stock"""
+        client = Mock()
+        client.get_locations.return_value = {
+            "locations": [location("A"), location("B", "DISABLED")], "total": 2}
+
+        assert LocationCache(client).enabled_keys() == {"A"}
+
+    def test_expiry_refetches(self):
+        """Test the list is refetched after the TTL"""
+        client = make_client()
+        cache = LocationCache(client, ttl=10)
+
+        with patch('ebay_locations.time.monotonic', return_value=100.0):
+            cache.locations()
+        with patch('ebay_locations.time.monotonic', return_value=111.0):
+            cache.locations()
+
+        assert client.get_locations.call_count == 2
+
+
+class TestAggregation:
+    """Test suite for local availability computation"""
+
+    def test_aggregate_availability(self):
+        """Test per-SKU and per-location totals"""
+        result = aggregate_availability({
+            "A": {"WH1": 2, "WH2": 3},
+            "B": {"WH1": 4},
+        })
+
+        assert result == {"by_sku": {"A": 5, "B": 4},
+                          "by_location": {"WH1": 6, "WH2": 3}}
+
+    def test_build_location_request(self):
+        """Test the request carries the total and the distribution"""
+        assert build_location_request("A", {"WH2": 3, "WH1": 2}) == {
+            "sku": "A",
+            "shipToLocationAvailability": {
+                "quantity": 5,
+                "availabilityDistributions": [
+                    {"merchantLocationKey": "WH1", "quantity": 2},
+                    {"merchantLocationKey": "WH2", "quantity": 3},
+                ],
+            },
+        }
+
+
+class TestUpdateLocationStock:
+    """Test suite for update_location_stock"""
+
+    def test_batches_by_bulk_limit(self):
+        """Test SKUs are sent in the fewest batches"""
+        client = make_client()
+        quantities = {f"SKU{i}": {"WH1": i, "WH2": 1} for i in range(BULK_LIMIT * 2 + 1)}
+
+        updated, errors = update_location_stock(client, quantities)
+
+        assert errors == {}
+        assert len(updated) == BULK_LIMIT * 2 + 1
+        assert [len(c.args[0]) for c in client.bulk_update_price_quantity.call_args_list] == [
+            BULK_LIMIT, BULK_LIMIT, 1]
+
+    def test_locations_cached_across_calls(self):
+        """Test repeated calls reuse the client's location list"""
+        client = make_client()
+
+        update_location_stock(client, {"A": {"WH1": 1}})
+        update_location_stock(client, {"B": {"WH2": 2}})
+
+        assert client.get_locations.call_count == 1
+        assert location_cache(client) is location_cache(client)
+        assert location_cache(make_client()) is not location_cache(client)
+
+    def test_unknown_location_refreshes_once(self):
+        """Test an unknown key triggers one refresh before being rejected"""
+        client = make_client()
+        cache = LocationCache(client)
+        cache.locations()
+
+        updated, errors = update_location_stock(
+            client, {"A": {"WH1": 1}, "B": {"WH9": 1}}, locations=cache)
+
+        assert updated == ["A"]
+        assert errors == {"B": "Unknown location: WH9"}
+        assert client.get_locations.call_count == 2
+
+    def test_new_location_found_after_refresh(self):
+        """Test a warehouse added after caching is picked up"""
+        client = make_client(locations=("WH1",))
+        cache = LocationCache(client)
+        cache.locations()
+        client.get_locations.return_value = {
+            "locations": [location("WH1"), location("WH3")], "total": 2}
+
+        updated, errors = update_location_stock(client, {"A": {"WH3": 4}},
+                                                locations=cache)
+
+        assert (updated, errors) == (["A"], {})
+
+    def test_negative_quantities_rejected(self):
+        """Test negative quantities never reach eBay"""
+        client = make_client()
+
+        updated, errors = update_location_stock(client, {"A": {"WH1": -1}})
+
+        assert errors == {"A": "Quantities must not be negative"}
+        client.bulk_update_price_quantity.assert_not_called()
+
+    def test_partial_failure(self):
+        """Test per-SKU failures from a 207 response are reported"""
+        client = make_client()
+        client.bulk_update_price_quantity.side_effect = lambda batch: [
+            {"sku": "A", "statusCode": 200},
+            {"sku": "B", "statusCode": 400,
+             "errors": [{"errorId": 25001, "message": "Invalid quantity"}]},
+        ]
+
+        updated, errors = update_location_stock(
+            client, {"A": {"WH1": 1}, "B": {"WH1": 1}, "C": {"WH2": 1}})
+
+        assert updated == ["A"]
+        assert errors == {"B": "Invalid quantity", "C": "No response from eBay"}
+
+    def test_missing_status_is_an_error(self):
+        """Test a per-SKU response without statusCode is not counted as success"""
+        client = make_client()
+        client.bulk_update_price_quantity.side_effect = lambda batch: [
+            {"sku": "A", "statusCode": 200},
+            {"sku": "B"},
+        ]
+
+        updated, errors = update_location_stock(
+            client, {"A": {"WH1": 1}, "B": {"WH1": 1}})
+
+        assert updated == ["A"]
+        assert errors == {"B": "No status in eBay response"}
+
+    def test_failed_batch_marks_all_skus(self):
+        """Test a failed call reports every SKU in the batch"""
+        client = make_client()
+        client.bulk_update_price_quantity.side_effect = Exception(
+            "Error updating stock: boom")
+
+        updated, errors = update_location_stock(client, {"A": {"WH1": 1},
+                                                         "B": {"WH2": 1}})
+
+        assert updated == []
+        assert errors == {"A": "Error updating stock: boom",
+                          "B": "Error updating stock: boom"}
+
+
+class TestAccountClientEndpoints:
+    """Test suite for the AccountClient location endpoints"""
+
+    def test_get_locations(self):
+        """Test the location listing request"""
+        client = AccountClient("a", "T")
+        response = Mock(status_code=200, json=Mock(return_value={"locations": []}))
+
+        with patch.object(client.session, 'request', return_value=response) as mock_request:
+            assert client.get_locations(limit=50, offset=100) == {"locations": []}
+            mock_request.assert_called_once_with(
+                "GET", f"{INVENTORY_API}/location",
+                params={"limit": 50, "offset": 100}, headers=build_headers("T"))
+
+    def test_bulk_update_price_quantity(self):
+        """Test the bulk request body and multi-status handling"""
+        client = AccountClient("a", "T")
+        response = Mock(status_code=207, json=Mock(
+            return_value={"responses": [{"sku": "A", "statusCode": 200}]}))
+
+        with patch.object(client.session, 'request', return_value=response) as mock_request:
+            result = client.bulk_update_price_quantity([{"sku": "A"}])
+
+        assert result == [{"sku": "A", "statusCode": 200}]
+        assert mock_request.call_args[1]["json"] == {"requests": [{"sku": "A"}]}
+
+    def test_bulk_update_error(self):
+        """Test non-2xx bulk responses raise"""
+        client = AccountClient("a", "T")
+        response = Mock(status_code=400, text="Bad request")
+
+        with patch.object(client.session, 'request', return_value=response):
+            with pytest.raises(Exception) as exc_info:
+                client.bulk_update_price_quantity([])
+
+        assert "Error updating stock: Bad request" in str(exc_info.value)
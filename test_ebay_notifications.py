@@ -0,0 +1,334 @@
+"""
+Unit tests for ebay_notifications.py
+
+This test suite covers:
+- Endpoint challenge hashing
+- Notification payload validation
+- Cache updates and invalidation
+- De-duplication and ordering by notificationId and eventDate
+- The HTTP receiver driven by the local stand-in sender
+- Loopback-only binding without a verifier
+"""
+
+import hashlib
+import http.client
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
+
+import pytest
+
+from conftest import stock_payload
+from ebay_cache import StockCache
+from ebay_daemon import InventoryService
+from ebay_notifications import (
+    DEFAULT_TOPIC,
+    DeliveryLog,
+    NotificationError,
+    NotificationReceiver,
+    apply_updates,
+    challenge_response,
+    is_loopback,
+    parse_delivery,
+    parse_notification,
+    send_notification,
+)
+
+
+def cached_quantity(cache, sku):
+    data = cache.get(sku)
+    return data["availability"]["ship_to_location_availability"]["quantity"]
+
+
+def notification(data, topic=DEFAULT_TOPIC, **fields):
+    return {"metadata": {"topic": topic}, "notification": {"data": data, **fields}}
+
+
+EARLIER = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+LATER = EARLIER + timedelta(minutes=5)
+# Cache timestamp older than both events
+BEFORE = (EARLIER - timedelta(minutes=5)).timestamp()
+
+
+class TestChallengeResponse:
+    """Test suite for challenge_response"""
+
+    def test_matches_ebay_hash_order(self):
+        """Test the hash covers code, token and endpoint in that order"""
+        expected = hashlib.sha256(b"code" + b"token" + b"https://x/y").hexdigest()
+
+        assert challenge_response("code", "token", "https://x/y") == expected
+
+
+class TestParseNotification:
+    """Test suite for parse_notification"""
+
+    def test_single_sku(self):
+        """Test a single-SKU data block"""
+        assert parse_notification(notification({"sku": "A", "quantity": 3})) == [("A", 3)]
+
+    def test_items_list_with_invalidation(self):
+        """Test an items list where one entry has no quantity"""
+        payload = notification({"items": [{"sku": "A", "quantity": 0}, {"sku": "B"}]})
+
+        assert parse_notification(payload) == [("A", 0), ("B", None)]
+
+    @pytest.mark.parametrize("payload", [
+        [],
+        {"notification": {"data": {"sku": "A"}}},
+        {"metadata": {"topic": "T"}},
+        notification({"items": []}),
+        notification({"items": ["A"]}),
+        notification({"sku": ""}),
+        notification({"sku": "A", "quantity": -1}),
+        notification({"sku": "A", "quantity": "3"}),
+        notification({"sku": "A", "quantity": True}),
+    ])
+    def test_invalid_payloads(self, payload):
+        """Test malformed payloads are rejected"""
+        with pytest.raises(NotificationError):
+            parse_notification(payload)
+
+    def test_topic_filter(self):
+        """Test payloads with unexpected topics are rejected"""
+        with pytest.raises(NotificationError) as exc_info:
+            parse_notification(notification({"sku": "A"}, topic="OTHER"),
+                               topics={"MARKETPLACE_ACCOUNT_INVENTORY"})
+
+        assert "Unexpected topic: OTHER" in str(exc_info.value)
+
+
+class TestParseDelivery:
+    """Test suite for parse_delivery"""
+
+    def test_id_and_event_date(self):
+        """Test notificationId and a Z-suffixed eventDate are returned"""
+        payload = notification({"sku": "A"}, notificationId="n1",
+                               eventDate="2024-05-01T12:00:00.000Z")
+
+        assert parse_delivery(payload) == ("n1", EARLIER)
+
+    def test_missing_fields(self):
+        """Test both fields are optional"""
+        assert parse_delivery(notification({"sku": "A"})) == (None, None)
+
+    @pytest.mark.parametrize("fields", [
+        {"notificationId": 7},
+        {"eventDate": "yesterday"},
+        {"eventDate": 1714564800},
+    ])
+    def test_invalid_fields(self, fields):
+        """Test malformed ids and dates are rejected"""
+        with pytest.raises(NotificationError):
+            parse_delivery(notification({"sku": "A"}, **fields))
+
+
+class TestDeliveryLog:
+    """Test suite for DeliveryLog ordering and de-duplication"""
+
+    def test_duplicate_id_is_ignored(self):
+        """Test a redelivered notification is not applied twice"""
+        cache = StockCache()
+        log = DeliveryLog()
+        cache.put("A", stock_payload("A", 10))
+
+        assert log.apply(cache, "n1", EARLIER, [("A", 5)]) is True
+        cache.put("A", stock_payload("A", 8))
+        assert log.apply(cache, "n1", EARLIER, [("A", 5)]) is False
+        assert cached_quantity(cache, "A") == 8
+
+    def test_older_event_does_not_overwrite(self):
+        """Test an out-of-order delivery leaves the newer quantity"""
+        cache = StockCache()
+        log = DeliveryLog()
+        cache.put("A", stock_payload("A", 10), as_of=BEFORE)
+        cache.put("B", stock_payload("B", 10), as_of=BEFORE)
+
+        log.apply(cache, "n2", LATER, [("A", 3)])
+        log.apply(cache, "n1", EARLIER, [("A", 9), ("B", 4)])
+
+        assert cached_quantity(cache, "A") == 3
+        assert cached_quantity(cache, "B") == 4
+
+    def test_event_older_than_cached_data_invalidates(self):
+        """Test a late event cannot overwrite data fetched or written after it"""
+        cache = StockCache()
+        log = DeliveryLog()
+        event_time = datetime.now(timezone.utc) - timedelta(seconds=30)
+        cache.put("A", stock_payload("A", 50))
+
+        log.apply(cache, "n1", event_time, [("A", 4)])
+
+        assert cache.get("A") is None
+
+    def test_undated_event_only_invalidates(self):
+        """Test a notification without eventDate cannot set a quantity"""
+        cache = StockCache()
+        log = DeliveryLog()
+        cache.put("A", stock_payload("A", 10))
+
+        log.apply(cache, "n1", None, [("A", 3)])
+
+        assert cache.get("A") is None
+
+    def test_remembers_bounded_ids(self):
+        """Test only the most recent ids are kept"""
+        cache = StockCache()
+        log = DeliveryLog(max_ids=2)
+        for notification_id in ("n1", "n2", "n3"):
+            log.apply(cache, notification_id, EARLIER, [])
+
+        assert log.apply(cache, "n1", EARLIER, []) is True
+        assert log.apply(cache, "n3", EARLIER, []) is False
+
+
+class TestApplyUpdates:
+    """Test suite for apply_updates"""
+
+    def test_updates_cached_and_invalidates_rest(self):
+        """Test cached SKUs are updated and quantity-less ones dropped"""
+        cache = StockCache()
+        cache.put("A", stock_payload("A", 1))
+        cache.put("B", stock_payload("B", 1))
+
+        assert apply_updates(cache, [("A", 5), ("B", None), ("C", 2)]) == (1, 1)
+        assert cached_quantity(cache, "A") == 5
+        assert cache.get("B") is None
+        assert cache.get("C") is None
+
+
+@pytest.fixture
+def receiver():
+    cache = StockCache(ttl=3600)
+    server = NotificationReceiver(("127.0.0.1", 0), cache,
+                                  verification_token="token",
+                                  endpoint="https://example.test/notify")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestNotificationReceiver:
+    """Test suite for the HTTP receiver with the stand-in sender"""
+
+    def test_notification_updates_cache(self, receiver):
+        """Test a sale notification rewrites the cached quantity"""
+        receiver.cache.put("A", stock_payload("A", 10))
+        receiver.cache.put("B", stock_payload("B", 10))
+
+        status = send_notification(receiver.url, [("A", 7), ("B", None)])
+
+        assert status == 204
+        assert cached_quantity(receiver.cache, "A") == 7
+        assert receiver.cache.get("B") is None
+
+    def test_invalid_payload_is_rejected(self, receiver):
+        """Test invalid quantities produce a 400 and leave the cache alone"""
+        receiver.cache.put("A", stock_payload("A", 10))
+
+        assert send_notification(receiver.url, [("A", -4)]) == 400
+        assert cached_quantity(receiver.cache, "A") == 10
+
+    def test_invalid_json_is_rejected(self, receiver):
+        """Test non-JSON bodies produce a 400"""
+        request = urllib.request.Request(receiver.url, data=b"{nope",
+                                         method="POST")
+        with pytest.raises(urllib.error.HTTPError) as exc_info:
+            urllib.request.urlopen(request)
+
+        assert exc_info.value.code == 400
+
+    def test_verifier_can_reject(self, receiver):
+        """Test a failing verifier blocks the update"""
+        receiver.verifier = lambda headers, body: headers.get("X-EBAY-SIGNATURE") == "ok"
+        receiver.cache.put("A", stock_payload("A", 10))
+
+        assert send_notification(receiver.url, [("A", 1)]) == 401
+        assert send_notification(receiver.url, [("A", 1)],
+                                 headers={"X-EBAY-SIGNATURE": "ok"}) == 204
+        assert cached_quantity(receiver.cache, "A") == 1
+
+    def test_redelivery_is_ignored(self, receiver):
+        """Test the same notificationId only updates the cache once"""
+        receiver.cache.put("A", stock_payload("A", 10))
+        assert send_notification(receiver.url, [("A", 7)], notification_id="n1") == 204
+        receiver.cache.put("A", stock_payload("A", 6))
+
+        assert send_notification(receiver.url, [("A", 7)], notification_id="n1") == 204
+        assert cached_quantity(receiver.cache, "A") == 6
+
+    def test_out_of_order_delivery_is_dropped(self, receiver):
+        """Test an older eventDate does not overwrite a newer quantity"""
+        receiver.cache.put("A", stock_payload("A", 10), as_of=BEFORE)
+
+        send_notification(receiver.url, [("A", 2)], event_date=LATER.isoformat())
+        send_notification(receiver.url, [("A", 9)], event_date=EARLIER.isoformat())
+
+        assert cached_quantity(receiver.cache, "A") == 2
+
+    def test_late_event_after_daemon_write_invalidates(self, receiver):
+        """Test a sale reported after the daemon's own update is not applied"""
+        client = Mock()
+        client.get_stock.return_value = stock_payload("A", 5)
+        service = InventoryService(client, receiver.cache)
+        service.get_stock("A")
+        sold_at = datetime.now(timezone.utc)
+        time.sleep(0.01)
+        service.update_stock("A", 50)
+
+        send_notification(receiver.url, [("A", 4)], event_date=sold_at.isoformat())
+
+        assert receiver.cache.get("A") is None
+        assert service.get_stock("A") == stock_payload("A", 5)
+        assert client.get_stock.call_count == 2
+
+    def test_negative_content_length_is_rejected(self, receiver):
+        """Test a negative Content-Length is refused before reading"""
+        host, port = receiver.server_address[:2]
+        connection = http.client.HTTPConnection(host, port, timeout=5)
+        connection.putrequest("POST", "/")
+        connection.putheader("Content-Length", "-1")
+        connection.endheaders()
+        response = connection.getresponse()
+        connection.close()
+
+        assert response.status == 400
+
+    def test_refuses_public_address_without_verifier(self):
+        """Test an unverified receiver cannot listen beyond loopback"""
+        with pytest.raises(Exception) as exc_info:
+            NotificationReceiver(("0.0.0.0", 0), StockCache())
+
+        assert "unverified" in str(exc_info.value)
+
+    def test_public_address_with_verifier(self):
+        """Test a verifier allows binding a non-loopback address"""
+        server = NotificationReceiver(("0.0.0.0", 0), StockCache(),
+                                      verifier=lambda headers, body: True)
+        server.server_close()
+
+    @pytest.mark.parametrize("host, expected", [
+        ("127.0.0.1", True),
+        ("::1", True),
+        ("localhost", True),
+        ("0.0.0.0", False),
+        ("", False),
+        ("192.168.1.10", False),
+    ])
+    def test_is_loopback(self, host, expected):
+        """Test loopback detection for --notify-host values"""
+        assert is_loopback(host) is expected
+
+    def test_challenge(self, receiver):
+        """Test the GET endpoint validation challenge"""
+        with urllib.request.urlopen(receiver.url + "?challenge_code=abc") as response:
+            body = json.loads(response.read())
+
+        assert body == {"challengeResponse": challenge_response(
+            "abc", "token", "https://example.test/notify")}
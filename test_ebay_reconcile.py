@@ -0,0 +1,145 @@
+"""
+Unit tests for ebay_reconcile.py
+
+This test suite covers:
+- SKU interning and array alignment
+- Extraction of quantities from get_stock payloads
+- Reconciliation rules (safety stock, thresholds, zeroing, caps)
+- Agreement with a straightforward per-SKU reference loop
+"""
+
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from ebay_reconcile import (  # noqa: E402
+    MISSING,
+    SkuIndex,
+    align,
+    ebay_quantities,
+    load_side,
+    present,
+    reconcile,
+)
+
+
+class TestSkuIndex:
+    """Test suite for SkuIndex and alignment helpers"""
+
+    def test_interning_is_stable(self):
+        """Test the same SKU always maps to the same id"""
+        index = SkuIndex(["A", "B"])
+
+        assert index.intern("B") == 1
+        assert index.intern("C") == 2
+        assert list(index.intern_many(["C", "A", "D"])) == [2, 0, 3]
+        assert index.skus == ["A", "B", "C", "D"]
+
+    def test_load_and_align(self):
+        """Test two sides align on shared ids"""
+        index = SkuIndex()
+        left = load_side(index, {"A": 1, "B": 2})
+        right = load_side(index, {"B": 5, "C": 6})
+
+        assert list(align(*left, len(index))) == [1, 2, MISSING]
+        assert list(align(*right, len(index))) == [MISSING, 5, 6]
+
+    def test_present_marks_ids(self):
+        """Test membership masks come from ids, not values"""
+        index = SkuIndex()
+        ids, _ = load_side(index, {"A": MISSING, "C": 0})
+        index.intern("B")
+
+        assert list(present(ids, len(index))) == [True, True, False]
+
+
+class TestEbayQuantities:
+    """Test suite for ebay_quantities"""
+
+    def test_extracts_quantities(self):
+        """Test quantities are read from get_stock payloads"""
+        payloads = [
+            {"sku": "A", "availability": {"ship_to_location_availability": {"quantity": 4}}},
+            {"sku": "B"},
+        ]
+
+        assert ebay_quantities(payloads) == {"A": 4, "B": 0}
+
+
+class TestReconcile:
+    """Test suite for reconcile"""
+
+    def test_in_sync_needs_no_updates(self):
+        """Test matching quantities produce no updates"""
+        assert reconcile({"A": 3, "B": 0}, {"A": 3, "B": 0}) == {}
+
+    def test_drift_is_corrected(self):
+        """Test drifted quantities are pushed"""
+        assert reconcile({"A": 3, "B": 9}, {"A": 5, "B": 9}) == {"A": 3}
+
+    def test_safety_stock(self):
+        """Test safety stock is held back and never goes negative"""
+        assert reconcile({"A": 10, "B": 1}, {"A": 10, "B": 1},
+                         safety_stock=2) == {"A": 8, "B": 0}
+
+    def test_per_sku_safety_stock(self):
+        """Test a per-SKU safety stock mapping"""
+        assert reconcile({"A": 10, "B": 10}, {"A": 10, "B": 10},
+                         safety_stock={"A": 4, "Z": 1}) == {"A": 6}
+
+    def test_threshold_skips_small_drift(self):
+        """Test drift within the threshold is ignored"""
+        assert reconcile({"A": 10, "B": 20}, {"A": 11, "B": 25},
+                         threshold=2) == {"B": 20}
+
+    def test_zero_is_always_pushed(self):
+        """Test out-of-stock SKUs are zeroed even within the threshold"""
+        assert reconcile({"A": 0}, {"A": 1}, threshold=5) == {"A": 0}
+
+    def test_new_and_missing_skus(self):
+        """Test warehouse-only SKUs are listed and eBay-only SKUs zeroed"""
+        result = reconcile({"NEW": 4, "EMPTY": 0}, {"GONE": 3})
+
+        assert result == {"NEW": 4, "GONE": 0}
+
+    def test_zero_missing_disabled(self):
+        """Test eBay-only SKUs are left alone when zero_missing is off"""
+        assert reconcile({"A": 1}, {"GONE": 3}, zero_missing=False) == {"A": 1}
+
+    def test_max_quantity_cap(self):
+        """Test listed quantities are capped"""
+        assert reconcile({"A": 500}, {"A": 0}, max_quantity=100) == {"A": 100}
+
+    def test_empty_inputs(self):
+        """Test empty inputs reconcile to nothing"""
+        assert reconcile({}, {}) == {}
+
+    def test_negative_warehouse_quantity_is_present(self):
+        """Test oversold (negative) stock is zeroed, not treated as missing"""
+        assert reconcile({"A": -1, "B": -2}, {"A": 5, "B": 5},
+                         zero_missing=False) == {"A": 0, "B": 0}
+
+    @pytest.mark.parametrize("zero_missing", [True, False])
+    def test_matches_reference_loop(self, zero_missing):
+        """Test the vectorized result matches a per-SKU loop"""
+        rng = random.Random(7)
+        skus = [f"SKU{i}" for i in range(5000)]
+        warehouse = {s: rng.randint(-3, 20) for s in skus if rng.random() < 0.9}
+        ebay = {s: rng.randint(-3, 20) for s in skus if rng.random() < 0.9}
+        safety, threshold = 2, 1
+
+        expected = {}
+        for sku in set(warehouse) | set(ebay):
+            if sku not in warehouse and not zero_missing:
+                continue
+            target = max(warehouse[sku] - safety, 0) if sku in warehouse else 0
+            if sku not in ebay:
+                if target > 0:
+                    expected[sku] = target
+            elif abs(target - ebay[sku]) > threshold or (target == 0 and ebay[sku] > 0):
+                expected[sku] = target
+
+        assert reconcile(warehouse, ebay, safety_stock=safety, threshold=threshold,
+                         zero_missing=zero_missing) == expected
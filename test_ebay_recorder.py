@@ -0,0 +1,219 @@
+"""
+Unit tests for ebay_recorder.py
+
+This test suite covers:
+- Recording through AccountClient with credentials redacted
+- Per-entry flushing and loading truncated captures
+- Loading captures and summarizing latencies
+- Replaying captures with recorded latency and ordering
+"""
+
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from conftest import stock_payload
+from ebay_accounts import AccountClient
+from ebay_recorder import (
+    REDACTED,
+    Recorder,
+    ReplayServer,
+    latency_summary,
+    load_records,
+)
+
+
+def serve(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    def _send(self, status, body=b""):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        sku = self.path.rsplit("/", 1)[1]
+        if sku == "MISSING":
+            self._send(404, b'{"errors":[{"errorId":25702}]}')
+        else:
+            self._send(200, json.dumps(stock_payload(sku, 4)).encode())
+
+    def do_PUT(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self._send(204)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api():
+    server = serve(ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler))
+    yield f"http://127.0.0.1:{server.server_address[1]}/sell/inventory/v1"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def capture(tmp_path, api):
+    path = tmp_path / "traffic.jsonl.gz"
+    with Recorder(path) as recorder:
+        client = AccountClient("a", "SECRET-TOKEN", base_url=api,
+                               recorder=recorder)
+        client.get_stock("A")
+        client.update_stock("A", 9)
+        with pytest.raises(Exception):
+            client.get_stock("MISSING")
+        client.close()
+    return path
+
+
+class TestRecorder:
+    """Test suite for Recorder"""
+
+    def test_records_each_exchange(self, capture):
+        """Test every request/response pair is captured in order"""
+        records = load_records(capture)
+
+        assert [(r["method"], r["status"]) for r in records] == [
+            ("GET", 200), ("PUT", 204), ("GET", 404)]
+        assert json.loads(records[0]["response_body"]) == stock_payload("A", 4)
+        assert json.loads(records[1]["request_body"])[
+            "availability"]["ship_to_location_availability"]["quantity"] == 9
+        assert all(r["elapsed"] >= 0 for r in records)
+
+    def test_token_is_redacted(self, capture):
+        """Test the access token never reaches the capture file"""
+        records = load_records(capture)
+
+        assert all(r["request_headers"]["Authorization"] == REDACTED for r in records)
+        with gzip.open(capture, "rt") as f:
+            assert "SECRET-TOKEN" not in f.read()
+
+    def test_appends_to_existing_capture(self, capture, api):
+        """Test a second session appends to the same file"""
+        with Recorder(capture) as recorder:
+            client = AccountClient("a", "T", base_url=api, recorder=recorder)
+            client.get_stock("B")
+            client.close()
+
+        assert len(load_records(capture)) == 4
+
+    def test_entries_reach_disk_before_close(self, tmp_path, api):
+        """Test each entry is flushed so a killed recorder keeps its data"""
+        path = tmp_path / "live.jsonl.gz"
+        recorder = Recorder(path)
+        client = AccountClient("a", "T", base_url=api, recorder=recorder)
+        client.get_stock("A")
+        client.get_stock("B")
+
+        assert [r["url"].rsplit("/", 1)[1] for r in load_records(path)] == ["A", "B"]
+        client.close()
+        recorder.close()
+
+    def test_flush_every(self, tmp_path):
+        """Test entries can be flushed in batches"""
+        path = tmp_path / "batched.jsonl.gz"
+        recorder = Recorder(path, flush_every=2)
+        recorder.record("GET", "/a", {}, None, 200, {}, "", 0.1)
+        assert load_records(path) == []
+
+        recorder.record("GET", "/b", {}, None, 200, {}, "", 0.1)
+        assert len(load_records(path)) == 2
+        recorder.close()
+
+    @pytest.mark.parametrize("cut", [1, 8, 40])
+    def test_truncated_capture(self, capture, cut):
+        """Test a capture cut short still yields its complete entries"""
+        data = capture.read_bytes()
+        capture.write_bytes(data[:-cut])
+
+        records = load_records(capture)
+
+        assert 1 <= len(records) <= 3
+        assert [r["method"] for r in records] == ["GET", "PUT", "GET"][:len(records)]
+
+    def test_partial_last_line_is_dropped(self, tmp_path):
+        """Test a half-written final line is ignored"""
+        path = tmp_path / "partial.jsonl.gz"
+        with gzip.open(path, "wt") as f:
+            f.write('{"method": "GET", "elapsed": 0.1}\n{"method": "PU')
+
+        assert load_records(path) == [{"method": "GET", "elapsed": 0.1}]
+
+    def test_latency_summary(self):
+        """Test per-method latency percentiles"""
+        records = [{"method": "GET", "elapsed": e} for e in (0.3, 0.1, 0.2)]
+
+        assert latency_summary(records) == {
+            "GET": {"count": 3, "p50": 0.2, "p95": 0.2, "max": 0.3}}
+
+
+class TestReplayServer:
+    """Test suite for ReplayServer"""
+
+    def test_replay_serves_recorded_responses(self, capture):
+        """Test a client sees the recorded responses without the real API"""
+        server = serve(ReplayServer(("127.0.0.1", 0), load_records(capture)))
+        client = AccountClient("a", "T", base_url=server.base_url)
+        try:
+            assert client.get_stock("A") == stock_payload("A", 4)
+            client.update_stock("A", 9)
+            with pytest.raises(Exception) as exc_info:
+                client.get_stock("MISSING")
+            assert "25702" in str(exc_info.value)
+        finally:
+            client.close()
+            server.shutdown()
+            server.server_close()
+
+    def test_replay_cycles_and_reports_unknown(self):
+        """Test responses rotate per path and unknown paths 404"""
+        records = [
+            {"method": "GET", "url": "https://api.ebay.com/sell/inventory/v1/inventory_item/A",
+             "status": 200, "response_headers": {"Content-Type": "application/json"},
+             "response_body": json.dumps(stock_payload("A", q)), "elapsed": 0.0}
+            for q in (1, 2)
+        ]
+        server = serve(ReplayServer(("127.0.0.1", 0), records))
+        client = AccountClient("a", "T", base_url=server.base_url)
+        try:
+            quantities = [client.get_stock("A")["availability"][
+                "ship_to_location_availability"]["quantity"] for _ in range(3)]
+            assert quantities == [1, 2, 1]
+            with pytest.raises(Exception) as exc_info:
+                client.get_stock("B")
+            assert "No recording for GET" in str(exc_info.value)
+        finally:
+            client.close()
+            server.shutdown()
+            server.server_close()
+
+    def test_replay_honours_latency_and_speed(self):
+        """Test recorded latency is reproduced and scaled by speed"""
+        records = [{"method": "GET",
+                    "url": "https://api.ebay.com/sell/inventory/v1/inventory_item/A",
+                    "status": 200, "response_headers": {},
+                    "response_body": "{}", "elapsed": 0.2}]
+        server = serve(ReplayServer(("127.0.0.1", 0), records, speed=2.0))
+        client = AccountClient("a", "T", base_url=server.base_url)
+        try:
+            started = time.perf_counter()
+            client.get_stock("A")
+            elapsed = time.perf_counter() - started
+        finally:
+            client.close()
+            server.shutdown()
+            server.server_close()
+
+        assert 0.09 <= elapsed < 0.2
@@ -0,0 +1,278 @@
+"""
+Unit tests for ebay_snapshot.py
+
+This test suite covers:
+- Writing and memory-mapped reading of snapshot columns
+- Optional raw payload storage
+- Streaming across spool flushes
+- export_snapshot by paged listing or concurrent fetches, with a mocked client
+- The CLI export and read commands
+"""
+
+import json
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from conftest import stock_payload
+import ebay_snapshot
+from ebay_accounts import AccountClient
+from ebay_inventory import INVENTORY_API
+from ebay_snapshot import (
+    Snapshot,
+    SnapshotWriter,
+    export_snapshot,
+    iter_inventory_items,
+    main,
+)
+
+
+def make_paged_client(count, page_size):
+    client = Mock()
+
+    def get_inventory_items(limit, offset):
+        assert limit == page_size
+        return {"total": count, "inventoryItems": [
+            stock_payload(f"SKU{i}", i) for i in range(offset, min(offset + limit, count))]}
+
+    client.get_inventory_items.side_effect = get_inventory_items
+    return client
+
+
+class TestSnapshotRoundTrip:
+    """Test suite for SnapshotWriter and Snapshot"""
+
+    def test_columns_round_trip(self, tmp_path):
+        """Test SKUs, quantities and timestamps read back unchanged"""
+        path = tmp_path / "inv.snap"
+        with SnapshotWriter(path) as writer:
+            writer.add("A", 3, fetched_at=1.5)
+            writer.add("Bé", 0, fetched_at=2.5)
+            writer.add("", 7, fetched_at=3.5)
+
+        with Snapshot(path) as snapshot:
+            assert len(snapshot) == 3
+            assert snapshot.columns() == ["sku_offsets", "sku_data",
+                                          "quantity", "fetched_at"]
+            assert list(snapshot.skus()) == ["A", "Bé", ""]
+            assert snapshot.sku(1) == "Bé"
+            assert list(snapshot.quantities) == [3, 0, 7]
+            assert list(snapshot.fetched_at) == [1.5, 2.5, 3.5]
+            assert snapshot.to_dict() == {"A": 3, "Bé": 0, "": 7}
+
+    def test_payload_column(self, tmp_path):
+        """Test raw payloads are stored when requested"""
+        path = tmp_path / "inv.snap"
+        with SnapshotWriter(path, include_payload=True) as writer:
+            writer.add_payload(stock_payload("A", 4), fetched_at=1.0)
+            writer.add("B", 1, payload=b'{"raw":1}')
+            writer.add("C", 2)
+
+        with Snapshot(path) as snapshot:
+            assert json.loads(snapshot.payload(0)) == stock_payload("A", 4)
+            assert snapshot.payload(1) == b'{"raw":1}'
+            assert snapshot.payload(2) == b""
+            assert snapshot.quantities[0] == 4
+
+    def test_missing_payload_column(self, tmp_path):
+        """Test reading payloads from a snapshot without them fails clearly"""
+        path = tmp_path / "inv.snap"
+        with SnapshotWriter(path) as writer:
+            writer.add("A", 1)
+
+        with Snapshot(path) as snapshot:
+            with pytest.raises(Exception) as exc_info:
+                snapshot.payload(0)
+
+        assert "no column: payload_offsets" in str(exc_info.value)
+
+    def test_streams_across_flushes(self, tmp_path):
+        """Test rows written across several spool flushes"""
+        path = tmp_path / "inv.snap"
+        with patch.object(ebay_snapshot, 'FLUSH_ROWS', 3):
+            with SnapshotWriter(path, include_payload=True) as writer:
+                for i in range(10):
+                    writer.add(f"SKU{i}", i, fetched_at=float(i), payload={"i": i})
+
+        with Snapshot(path) as snapshot:
+            assert list(snapshot.skus()) == [f"SKU{i}" for i in range(10)]
+            assert list(snapshot.quantities) == list(range(10))
+            assert json.loads(snapshot.payload(9)) == {"i": 9}
+
+    def test_empty_snapshot(self, tmp_path):
+        """Test a snapshot with no rows"""
+        path = tmp_path / "inv.snap"
+        SnapshotWriter(path).close()
+
+        with Snapshot(path) as snapshot:
+            assert len(snapshot) == 0
+            assert list(snapshot.skus()) == []
+            assert len(snapshot.quantities) == 0
+
+    def test_numpy_arrays(self, tmp_path):
+        """Test columns can be viewed as NumPy arrays"""
+        np = pytest.importorskip("numpy")
+        path = tmp_path / "inv.snap"
+        with SnapshotWriter(path) as writer:
+            writer.add("A", 5, fetched_at=1.0)
+            writer.add("B", 6, fetched_at=2.0)
+
+        with Snapshot(path) as snapshot:
+            quantities = snapshot.array("quantity")
+            fetched_at = snapshot.array("fetched_at")
+            assert quantities.dtype == np.int64
+            assert int(quantities.sum()) == 11
+
+        assert list(quantities) == [5, 6]
+        assert list(fetched_at) == [1.0, 2.0]
+
+    def test_empty_numpy_array(self, tmp_path):
+        """Test an empty column gives an empty array"""
+        pytest.importorskip("numpy")
+        path = tmp_path / "inv.snap"
+        SnapshotWriter(path).close()
+
+        with Snapshot(path) as snapshot:
+            assert len(snapshot.array("quantity")) == 0
+
+    def test_close_with_live_column_slices(self, tmp_path):
+        """Test closing does not fail while column slices are referenced"""
+        path = tmp_path / "inv.snap"
+        with SnapshotWriter(path) as writer:
+            writer.add("A", 5, fetched_at=1.0)
+
+        with Snapshot(path) as snapshot:
+            head = snapshot.quantities[:1]
+
+        assert head.tolist() == [5]
+
+    def test_rejects_other_files(self, tmp_path):
+        """Test opening a non-snapshot file fails"""
+        path = tmp_path / "other.bin"
+        path.write_bytes(b"x" * 64)
+
+        with pytest.raises(Exception) as exc_info:
+            Snapshot(path)
+
+        assert "Not an inventory snapshot" in str(exc_info.value)
+
+    def test_failed_write_leaves_no_file(self, tmp_path):
+        """Test an exception while writing does not publish a snapshot"""
+        path = tmp_path / "inv.snap"
+
+        with pytest.raises(RuntimeError):
+            with SnapshotWriter(path) as writer:
+                writer.add("A", 1)
+                raise RuntimeError("boom")
+
+        assert not path.exists()
+
+
+class TestExportSnapshot:
+    """Test suite for export_snapshot and the CLI"""
+
+    def test_export_collects_errors(self, tmp_path):
+        """Test failing SKUs are reported and skipped"""
+        client = Mock()
+
+        def get_stock(sku):
+            if sku == "BAD":
+                raise Exception("Error fetching stock: Not found")
+            return stock_payload(sku, 2)
+
+        client.get_stock.side_effect = get_stock
+        path = tmp_path / "inv.snap"
+
+        written, errors = export_snapshot(client, ["A", "BAD", "C"], path)
+
+        assert written == 2
+        assert errors == {"BAD": "Error fetching stock: Not found"}
+        with Snapshot(path) as snapshot:
+            assert snapshot.to_dict() == {"A": 2, "C": 2}
+
+    def test_export_is_concurrent_and_ordered(self, tmp_path):
+        """Test SKUs are fetched in parallel but written in input order"""
+        client = Mock()
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def get_stock(sku):
+            with lock:
+                active.append(sku)
+                peak.append(len(active))
+            time.sleep(0.02 if int(sku[3:]) % 2 else 0.001)
+            with lock:
+                active.remove(sku)
+            return stock_payload(sku, int(sku[3:]))
+
+        client.get_stock.side_effect = get_stock
+        skus = [f"SKU{i}" for i in range(40)]
+        path = tmp_path / "inv.snap"
+
+        with patch('ebay_snapshot.EXPORT_CHUNK', 16):
+            written, errors = export_snapshot(client, skus, path, workers=8)
+
+        assert (written, errors) == (40, {})
+        assert max(peak) > 1
+        with Snapshot(path) as snapshot:
+            assert list(snapshot.skus()) == skus
+            assert list(snapshot.quantities) == list(range(40))
+
+    def test_export_whole_account_by_pages(self, tmp_path):
+        """Test skus=None streams the paged listing instead of per-SKU calls"""
+        client = make_paged_client(450, page_size=200)
+        path = tmp_path / "inv.snap"
+
+        written, errors = export_snapshot(client, None, path)
+
+        assert (written, errors) == (450, {})
+        assert client.get_inventory_items.call_count == 3
+        client.get_stock.assert_not_called()
+        with Snapshot(path) as snapshot:
+            assert snapshot.sku(449) == "SKU449"
+            assert snapshot.quantities[449] == 449
+
+    def test_iter_inventory_items_stops_on_empty_page(self):
+        """Test paging ends when the API returns no items"""
+        client = Mock()
+        client.get_inventory_items.return_value = {"total": 10, "inventoryItems": []}
+
+        assert list(iter_inventory_items(client)) == []
+
+    def test_get_inventory_items_endpoint(self):
+        """Test AccountClient lists inventory items with paging params"""
+        client = AccountClient("a", "T")
+        with patch.object(client.session, 'request') as mock_request:
+            mock_request.return_value = Mock(status_code=200,
+                                             json=Mock(return_value={"total": 0}))
+            assert client.get_inventory_items(limit=200, offset=400) == {"total": 0}
+
+        args, kwargs = mock_request.call_args
+        assert args == ("GET", f"{INVENTORY_API}/inventory_item")
+        assert kwargs["params"] == {"limit": 200, "offset": 400}
+
+    def test_cli_export_without_sku_file(self, tmp_path, capsys):
+        """Test export with only an output path reads the whole account"""
+        path = tmp_path / "inv.snap"
+        with patch('ebay_accounts.AccountClient.get_inventory_items',
+                   side_effect=lambda limit, offset: make_paged_client(
+                       3, limit).get_inventory_items(limit, offset)):
+            assert main(["export", str(path), "--token", "T"]) == 0
+
+        assert "Wrote 3 rows" in capsys.readouterr().out
+
+    def test_info_and_dump(self, tmp_path, capsys):
+        """Test the info and dump commands"""
+        path = tmp_path / "inv.snap"
+        with SnapshotWriter(path) as writer:
+            writer.add("A,1", 3, fetched_at=1.0)
+
+        assert main(["info", str(path)]) == 0
+        assert "rows: 1" in capsys.readouterr().out
+
+        assert main(["dump", str(path)]) == 0
+        assert capsys.readouterr().out.splitlines() == [
+            "sku,quantity,fetched_at", '"A,1",3,1.0']
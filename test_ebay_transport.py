@@ -0,0 +1,186 @@
+"""
+Unit tests for ebay_transport.py
+
+This test suite covers:
+- Transport selection by name or instance in AccountClient
+- Per-account headers over shared transport instances
+- Compression negotiation headers
+- HTTP/2 multiplexing and gzip decoding against a local stand-in
+- Recording traffic sent through the HTTP/2 transport
+"""
+
+import gzip
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+import pytest
+
+from ebay_accounts import AccountClient, AccountRegistry
+from ebay_inventory import build_headers
+from ebay_recorder import Recorder, load_records
+from ebay_transport import (
+    ACCEPT_ENCODING,
+    Http2Transport,
+    RequestsTransport,
+    Transport,
+    create_transport,
+)
+
+
+class TestRequestsTransport:
+    """Test suite for RequestsTransport"""
+
+    def test_headers_and_compression(self):
+        """Test default headers and Accept-Encoding are set on the session"""
+        transport = RequestsTransport(headers={"Authorization": "Bearer T"})
+
+        assert transport.session.headers["Accept-Encoding"] == ACCEPT_ENCODING
+        assert transport.session.headers["Authorization"] == "Bearer T"
+
+    def test_request_delegates_to_session(self):
+        """Test requests go straight through the session"""
+        transport = RequestsTransport()
+
+        with patch.object(transport.session, 'request') as mock_request:
+            transport.request("GET", "http://x/y", json={"a": 1})
+            mock_request.assert_called_once_with("GET", "http://x/y", json={"a": 1})
+
+
+class TestTransportSelection:
+    """Test suite for choosing transports"""
+
+    def test_default_is_requests(self):
+        """Test AccountClient uses the requests transport by default"""
+        client = AccountClient("a", "T")
+
+        assert isinstance(client.transport, RequestsTransport)
+        assert client.session is client.transport.session
+
+    def test_unknown_transport(self):
+        """Test unknown transport names are rejected"""
+        with pytest.raises(Exception) as exc_info:
+            create_transport("carrier-pigeon")
+
+        assert "Unknown transport: carrier-pigeon" in str(exc_info.value)
+
+    def test_custom_transport_instance(self):
+        """Test a Transport instance is used as-is with per-request headers"""
+        transport = Mock(spec=Transport)
+        transport.request.return_value = Mock(status_code=200,
+                                              json=Mock(return_value={"sku": "A"}))
+        client = AccountClient("a", "T", transport=transport)
+
+        assert client.get_stock("A") == {"sku": "A"}
+        assert transport.request.call_args[1]["headers"] == build_headers("T")
+        assert client.session is None
+        client.close()
+        transport.close.assert_called_once()
+
+    def test_accounts_can_share_one_transport(self):
+        """Test each account sends its own token over a shared transport"""
+        transport = RequestsTransport(headers={"Authorization": "Bearer OLD"})
+        registry = AccountRegistry()
+        registry.register("c", "TOKEN_C", transport=transport)
+        clients = [AccountClient("a", "TOKEN_A", transport=transport),
+                   AccountClient("b", "TOKEN_B", transport=transport),
+                   registry.client("c")]
+
+        with patch.object(transport.session, 'request',
+                          return_value=Mock(status_code=200, json=Mock(return_value={}))) as mock_request:
+            for client in clients:
+                client.get_stock("A")
+
+        assert [c[1]["headers"]["Authorization"] for c in mock_request.call_args_list] == [
+            "Bearer TOKEN_A", "Bearer TOKEN_B", "Bearer TOKEN_C"]
+        assert transport.session.headers["Authorization"] == "Bearer OLD"
+
+    def test_incomplete_transport_fails_at_construction(self):
+        """Test a custom transport without request() cannot be built"""
+        class NoRequest(Transport):
+            pass
+
+        class Minimal(Transport):
+            def request(self, method, url, **kwargs):
+                return None
+
+        with pytest.raises(TypeError):
+            NoRequest()
+        Minimal().close()
+
+    def test_registry_passes_transport(self):
+        """Test the registry forwards the transport name"""
+        pytest.importorskip("h2")
+        registry = AccountRegistry()
+        registry.register("a", "T", transport="http2")
+
+        assert isinstance(registry.client("a").transport, Http2Transport)
+        registry.close()
+
+    def test_http2_without_httpx(self):
+        """Test a clear error when httpx is not installed"""
+        with patch.dict(sys.modules, {"httpx": None}):
+            with pytest.raises(Exception) as exc_info:
+                Http2Transport()
+
+        assert "pip install 'httpx[http2]'" in str(exc_info.value)
+
+
+@pytest.fixture
+def h2_server():
+    pytest.importorskip("h2")
+    pytest.importorskip("httpx")
+    from bench_transport import Http2StandIn
+
+    server = Http2StandIn(delay=0.05)
+    yield server
+    server.stop()
+
+
+class TestHttp2Transport:
+    """Test suite for Http2Transport against the local HTTP/2 stand-in"""
+
+    def test_concurrent_calls_share_one_connection(self, h2_server):
+        """Test concurrent calls are multiplexed over a single connection"""
+        client = AccountClient("a", "T", base_url=h2_server.base_url,
+                               transport=Http2Transport(
+                                   pool_size=1, prior_knowledge=True))
+        try:
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                results = list(executor.map(client.get_stock,
+                                            [f"SKU{i}" for i in range(16)]))
+        finally:
+            client.close()
+
+        assert [r["sku"] for r in results] == [f"SKU{i}" for i in range(16)]
+        assert h2_server.connections == 1
+
+    def test_gzip_is_negotiated_and_decoded(self, h2_server):
+        """Test gzip responses arrive decoded"""
+        transport = Http2Transport(prior_knowledge=True)
+        try:
+            response = transport.request("GET", f"{h2_server.base_url}/inventory_item/A")
+        finally:
+            transport.close()
+
+        assert response.http_version == "HTTP/2"
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json()["sku"] == "A"
+
+    def test_recorder_handles_http2_responses(self, h2_server, tmp_path):
+        """Test HTTP/2 traffic can be captured"""
+        path = tmp_path / "h2.jsonl.gz"
+        with Recorder(path) as recorder:
+            client = AccountClient("a", "SECRET", base_url=h2_server.base_url,
+                                   recorder=recorder,
+                                   transport=Http2Transport(
+                                       prior_knowledge=True))
+            client.get_stock("A")
+            client.close()
+
+        (entry,) = load_records(path)
+        assert entry["url"].endswith("/inventory_item/A")
+        assert entry["request_headers"]["authorization"] == "<redacted>"
+        with gzip.open(path, "rt") as f:
+            assert "SECRET" not in f.read()
+        assert entry["status"] == 200